@@ -0,0 +1,49 @@
+# Messages per second through the bad word filter, old substring loop vs WordFilter.
+#
+# usage: python bench_filter.py [messages]
+import sys
+import time
+import random
+import string
+from word_filter import WordFilter, normalize
+
+
+def random_word(rng):
+    return "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+
+
+def naive_find(words, text):
+    # what on_message used to do
+    text = text.lower()
+    for word in words:
+        if word in text:
+            return word
+    return None
+
+
+def rate(check, messages):
+    start = time.perf_counter()
+    for text in messages:
+        check(text)
+    return len(messages) / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rng = random.Random(42)
+    vocabulary = [random_word(rng) for _ in range(5000)]
+    # typical chat messages: 5 - 30 ordinary words
+    messages = [" ".join(rng.choices(vocabulary, k=rng.randint(5, 30))) for _ in range(count)]
+
+    print(f"{'words':>6} | {'naive msg/s':>12} | {'WordFilter msg/s':>16} | {'whole words msg/s':>17}")
+    for size in (10, 100, 1000, 10000):
+        words = [random_word(rng) + "x" for _ in range(size)]
+        words = [normalize(w) for w in words]
+        naive = rate(lambda text: naive_find(words, text), messages[: max(200, count // size)])
+        compiled = rate(WordFilter(words).find, messages)
+        whole = rate(WordFilter(words, whole_words=True).find, messages)
+        print(f"{size:>6} | {naive:>12,.0f} | {compiled:>16,.0f} | {whole:>17,.0f}")
+
+
+if __name__ == "__main__":
+    main()
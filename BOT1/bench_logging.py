@@ -0,0 +1,99 @@
+# Event-loop lag while logging gateway events at DEBUG, old FileHandler vs log_setup's pipeline.
+#
+# Fakes what discord.gateway logs for every event (GUILD_CREATE and member chunks
+# are the big ones) at a fixed rate and measures how late the loop wakes up a
+# 10 ms sleeper while that is going on.
+#
+# usage: python bench_logging.py [events per second] [seconds]
+import os
+import sys
+import atexit
+import time
+import asyncio
+import logging
+import tempfile
+import log_setup
+
+
+def percentile(values, pct):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))] if values else 0.0
+
+
+def fake_event(i):
+    if i % 50 == 0:
+        # a member chunk, 1000 members
+        members = [{"user": {"id": str(10 ** 17 + n), "username": f"user{n}", "avatar": None, "bot": False},
+                    "roles": [], "joined_at": "2025-09-19T00:15:30.000000+00:00", "nick": None}
+                   for n in range(1000)]
+        return {"t": "GUILD_MEMBERS_CHUNK", "s": i, "op": 0, "d": {"guild_id": "1", "members": members}}
+    return {"t": "MESSAGE_CREATE", "s": i, "op": 0, "d": {"content": "hello there", "channel_id": "2", "author": {"id": "3"}}}
+
+
+async def sample_lag(lags, interval=0.01):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run(rate, seconds):
+    gateway = logging.getLogger("discord.gateway")
+    events = [fake_event(i) for i in range(200)]
+    lags = []
+    lag_task = asyncio.ensure_future(sample_lag(lags))
+    spent = 0.0
+    sent = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        # a burst every 10 ms, like events arriving in a busy guild
+        for _ in range(max(1, rate // 100)):
+            start = time.perf_counter()
+            gateway.debug("For Shard ID %s: WebSocket Event: %s", None, events[sent % len(events)])
+            spent += time.perf_counter() - start
+            sent += 1
+        await asyncio.sleep(0.01)
+    lag_task.cancel()
+    return lags, spent / sent
+
+
+def reset(logger):
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+        handler.close()
+
+
+def main():
+    rate = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    folder = tempfile.mkdtemp(prefix="log_bench_")
+    discord_logger = logging.getLogger("discord")
+
+    print(f"{rate} events/s for {seconds:.0f} s")
+    print(f"{'mode':>22} | {'per event':>10} | {'loop lag p50':>12} | {'p99':>8} | {'max':>8} | {'file size':>10}")
+    for mode in ("FileHandler (old)", "queue + shortening", "queue + sampling"):
+        path = os.path.join(folder, mode.split()[-1] + ".log")
+        if mode.startswith("FileHandler"):
+            # what bot.run(log_handler=FileHandler(mode='w'), log_level=DEBUG) sets up
+            handler = logging.FileHandler(path, encoding="utf-8", mode="w")
+            handler.setFormatter(log_setup.FORMAT)
+            discord_logger.addHandler(handler)
+            discord_logger.setLevel(logging.DEBUG)
+            listener = None
+        else:
+            os.environ["LOG_FILE"] = path
+            # the middle run keeps every event, only cut short
+            os.environ["LOG_SAMPLE"] = log_setup.DEFAULT_SAMPLE if "sampling" in mode else ""
+            listener = log_setup.setup_logging(logging.DEBUG)
+
+        lags, per_event = asyncio.run(run(rate, seconds))
+        if listener:
+            listener.stop()
+            atexit.unregister(listener.stop)
+        reset(discord_logger)
+        print(f"{mode:>22} | {per_event * 1e6:7.1f} us | {percentile(lags, 50) * 1000:9.2f} ms | "
+              f"{percentile(lags, 99) * 1000:5.2f} ms | {max(lags) * 1000:5.2f} ms | {os.path.getsize(path) / 1024:7.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import heapq
+import asyncio
+import itertools
+
+
+class _Waiter:
+    __slots__ = ("future", "check")
+
+    def __init__(self, future, check):
+        self.future = future
+        self.check = check
+
+
+class Conversations:
+    """Hands messages to commands waiting for somebody's reply, like bot.wait_for but indexed.
+
+    bot.wait_for runs every waiting check against every message, so each running
+    game makes all messages a bit slower. Here waiters are filed under
+    (channel_id, author_id) and a message only looks at its own slot. Timeouts
+    share one timer: a heap of deadlines and a single loop.call_at for the
+    earliest one, instead of a timer per waiter.
+    """
+
+    def __init__(self):
+        self._waiting = {}  # (channel_id, author_id) -> [_Waiter, ...] oldest first
+        self._deadlines = []  # (when, seq, waiter), finished waiters stay until their time comes
+        self._seq = itertools.count()
+        self._timer = None
+        self._timer_at = None
+
+    def __len__(self):
+        return sum(len(waiters) for waiters in self._waiting.values())
+
+    async def wait(self, channel_id, author_id, check=None, timeout=None):
+        """Returns the next message from `author_id` in `channel_id` that passes `check`.
+
+        Raises asyncio.TimeoutError after `timeout` seconds, just like wait_for.
+        """
+        loop = asyncio.get_running_loop()
+        key = (channel_id, author_id)
+        waiter = _Waiter(loop.create_future(), check)
+        self._waiting.setdefault(key, []).append(waiter)
+        if timeout is not None:
+            self._add_deadline(loop, loop.time() + timeout, waiter)
+        try:
+            return await waiter.future
+        finally:
+            waiters = self._waiting.get(key)
+            if waiters and waiter in waiters:
+                waiters.remove(waiter)
+                if not waiters:
+                    del self._waiting[key]
+
+    def feed(self, message):
+        """Gives a message to whoever waits for it, returns True if somebody took it."""
+        waiters = self._waiting.get((message.channel.id, message.author.id))
+        if not waiters:
+            return False
+        for waiter in waiters:
+            if waiter.future.done():
+                continue
+            if waiter.check is None or waiter.check(message):
+                waiter.future.set_result(message)
+                return True
+        return False
+
+    def _add_deadline(self, loop, when, waiter):
+        heapq.heappush(self._deadlines, (when, next(self._seq), waiter))
+        if self._timer_at is None or when < self._timer_at:
+            self._arm(loop, when)
+
+    def _arm(self, loop, when):
+        if self._timer:
+            self._timer.cancel()
+        self._timer_at = when
+        self._timer = loop.call_at(when, self._expire, loop)
+
+    def _expire(self, loop):
+        self._timer = self._timer_at = None
+        now = loop.time()
+        while self._deadlines and self._deadlines[0][0] <= now:
+            waiter = heapq.heappop(self._deadlines)[2]
+            if not waiter.future.done():
+                waiter.future.set_exception(asyncio.TimeoutError())
+        if self._deadlines:
+            self._arm(loop, self._deadlines[0][0])
@@ -0,0 +1,122 @@
+import os
+import queue
+import atexit
+import logging
+import reprlib
+import logging.handlers
+
+# share of DEBUG/INFO records kept for the chattiest loggers, warnings and errors are always kept
+DEFAULT_SAMPLE = "discord.gateway=0.05,discord.http=0.2"
+# loggers that put whole payloads in their messages
+DEFAULT_SHORTEN = "discord.gateway,discord.http"
+
+# the same look as discord.py's own file logging
+FORMAT = logging.Formatter("[{asctime}] [{levelname:<8}] {name}: {message}", "%Y-%m-%d %H:%M:%S", style="{")
+
+# cuts big payloads (GUILD_CREATE, member chunks) down while building the repr, instead of after
+_short = reprlib.Repr()
+_short.maxlevel = 3
+_short.maxdict = _short.maxlist = _short.maxtuple = _short.maxset = 8
+_short.maxstring = _short.maxother = 120
+
+
+def parse_sample(text):
+    """Turns "discord.gateway=0.05,discord.http=0.2" into {"discord.gateway": 0.05, "discord.http": 0.2}."""
+    rates = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, rate = part.partition("=")
+        rates[name.strip()] = float(rate)
+    return rates
+
+
+class Sampler(logging.Filter):
+    """Keeps every n-th DEBUG/INFO record of the sampled loggers. A counter is cheaper than random()."""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.every = {name: round(1 / rate) if rate > 0 else 0 for name, rate in rates.items()}
+        self._seen = dict.fromkeys(self.every, 0)
+
+    def filter(self, record):
+        every = self.every.get(record.name)
+        if every is None or record.levelno >= logging.WARNING:
+            return True
+        if every == 0:
+            return False  # rate 0 switches the logger's chatter off completely
+        seen = self._seen[record.name]
+        self._seen[record.name] = seen + 1
+        return seen % every == 0
+
+
+class LoopQueueHandler(logging.handlers.QueueHandler):
+    """Puts records on a queue for the writer thread, doing as little as possible on the event loop.
+
+    Only the message text is built here (the arguments may change once we return);
+    payloads of the `truncated` loggers are shortened with reprlib while doing that,
+    so a huge dict is never turned into a huge string. Timestamps, formatting and
+    the disk write happen on the writer thread. When the queue is full the record
+    is dropped and counted rather than making the loop wait.
+    """
+
+    def __init__(self, log_queue, truncated=(), max_chars=2000):
+        super().__init__(log_queue)
+        self.truncated = set(truncated)
+        self.max_chars = max_chars
+        self.dropped = 0
+
+    def prepare(self, record):
+        if record.args and record.name in self.truncated and isinstance(record.args, tuple):
+            record.args = tuple(
+                arg if isinstance(arg, (int, float)) else
+                arg[:self.max_chars] if isinstance(arg, str) else
+                _short.repr(arg)
+                for arg in record.args
+            )
+        message = record.getMessage()
+        if len(message) > self.max_chars:
+            message = f"{message[:self.max_chars]}... ({len(message)} chars)"
+        record.msg = message
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def setup_logging(level=logging.INFO, root=False):
+    """Logs to a rotating file through a background writer thread, returns the QueueListener.
+
+    Everything can be changed with environment variables:
+    LOG_FILE (discord.log), LOG_LEVEL, LOG_MAX_MB (10), LOG_BACKUPS (3),
+    LOG_ROTATE (e.g. "midnight", rotates by time instead of size),
+    LOG_SAMPLE (DEFAULT_SAMPLE), LOG_SHORTEN (DEFAULT_SHORTEN, whose payloads get
+    shortened) and LOG_TRUNCATE (2000 characters per message).
+    With `root` the records of every logger end up in the file, not just discord's.
+    """
+    path = os.getenv("LOG_FILE", "discord.log")
+    backups = int(os.getenv("LOG_BACKUPS", "3"))
+    if os.getenv("LOG_ROTATE"):
+        file_handler = logging.handlers.TimedRotatingFileHandler(
+            path, when=os.getenv("LOG_ROTATE"), backupCount=backups, encoding="utf-8")
+    else:
+        file_handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=int(float(os.getenv("LOG_MAX_MB", "10")) * 1024 ** 2), backupCount=backups, encoding="utf-8")
+    file_handler.setFormatter(FORMAT)
+
+    rates = parse_sample(os.getenv("LOG_SAMPLE", DEFAULT_SAMPLE))
+    log_queue = queue.Queue(maxsize=10000)
+    shortened = [name.strip() for name in os.getenv("LOG_SHORTEN", DEFAULT_SHORTEN).split(",") if name.strip()]
+    handler = LoopQueueHandler(log_queue, truncated=shortened, max_chars=int(os.getenv("LOG_TRUNCATE", "2000")))
+    handler.addFilter(Sampler(rates))
+
+    logger = logging.getLogger() if root else logging.getLogger("discord")
+    logger.setLevel(os.getenv("LOG_LEVEL", level))
+    logger.addHandler(handler)
+
+    listener = logging.handlers.QueueListener(log_queue, file_handler)
+    listener.start()
+    atexit.register(listener.stop)  # writes whatever is still queued on the way out
+    return listener
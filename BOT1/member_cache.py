@@ -0,0 +1,68 @@
+import time
+import random
+from collections import OrderedDict
+
+
+class ActiveMembers:
+    """The last `per_guild` people who said something in each server, for when the member list isn't cached.
+
+    Only ids and names are kept, oldest-active first, so the oldest one is the
+    one that goes when a server is full.
+    """
+
+    def __init__(self, per_guild=500):
+        self.per_guild = per_guild
+        self._guilds = {}  # guild_id -> OrderedDict(user_id -> name)
+
+    def seen(self, guild_id, user_id, name):
+        members = self._guilds.get(guild_id)
+        if members is None:
+            members = self._guilds[guild_id] = OrderedDict()
+        members[user_id] = name
+        members.move_to_end(user_id)
+        if len(members) > self.per_guild:
+            members.popitem(last=False)
+
+    def pick(self, guild_id):
+        """A random recently active member's name, or None if nobody talked yet."""
+        members = self._guilds.get(guild_id)
+        if not members:
+            return None
+        return random.choice(list(members.values()))
+
+    def __len__(self):
+        return sum(len(members) for members in self._guilds.values())
+
+
+class MemberLookup:
+    """Members we had to ask Discord for, kept `ttl` seconds so asking twice doesn't cost a second request.
+
+    Keyed by (guild_id, the mention, id or name that was looked up). At most
+    `max_size` are kept, the least recently used go first.
+    """
+
+    def __init__(self, ttl=300, max_size=1000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._members = OrderedDict()  # (guild_id, key) -> (member, expires)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, guild_id, key):
+        entry = self._members.get((guild_id, key))
+        if entry is None or entry[1] < time.monotonic():
+            self._members.pop((guild_id, key), None)
+            self.misses += 1
+            return None
+        self._members.move_to_end((guild_id, key))
+        self.hits += 1
+        return entry[0]
+
+    def put(self, guild_id, key, member):
+        self._members[(guild_id, key)] = (member, time.monotonic() + self.ttl)
+        self._members.move_to_end((guild_id, key))
+        while len(self._members) > self.max_size:
+            self._members.popitem(last=False)
+
+    def __len__(self):
+        return len(self._members)
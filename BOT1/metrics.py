@@ -0,0 +1,116 @@
+import time
+import asyncio
+from bisect import bisect_left
+
+# seconds, from a cache hit to a slow yt-dlp lookup
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # the last one is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class Metrics:
+    """Latency histograms and gauges, served in Prometheus' text format.
+
+    Only exists when METRICS_PORT is set, so with metrics off the bot pays one
+    `is None` check per command and event. Histograms are keyed by name and
+    labels, gauges are functions that are called when somebody scrapes.
+    """
+
+    def __init__(self, host="127.0.0.1", port=9100, lag_interval=0.5):
+        self.host = host
+        self.port = port
+        self.lag_interval = lag_interval
+        self._histograms = {}  # name -> {labels: Histogram}
+        self._gauges = {}  # name -> (type, help, function)
+        self._tasks = []
+
+    def observe(self, name, seconds, **labels):
+        series = self._histograms.setdefault(name, {})
+        key = tuple(sorted(labels.items()))
+        histogram = series.get(key)
+        if histogram is None:
+            histogram = series[key] = Histogram()
+        histogram.observe(seconds)
+
+    def gauge(self, name, function, help="", kind="gauge"):
+        """Registers `function()` as the value of `name`, use kind="counter" for totals that only go up."""
+        self._gauges[name] = (kind, help, function)
+
+    def remove(self, name):
+        self._gauges.pop(name, None)
+
+    def render(self):
+        lines = []
+        for name, series in self._histograms.items():
+            lines.append(f"# TYPE {name} histogram")
+            for labels, histogram in series.items():
+                running = 0
+                for bound, count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                    running += count
+                    lines.append(f"{name}_bucket{_labels(labels + (('le', bound),))} {running}")
+                lines.append(f"{name}_sum{_labels(labels)} {histogram.total}")
+                lines.append(f"{name}_count{_labels(labels)} {histogram.count}")
+        for name, (kind, help, function) in self._gauges.items():
+            try:
+                value = function()
+            except Exception as e:
+                print(f"Metric {name} failed: {e}")
+                continue
+            if help:
+                lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name} {'NaN' if value != value else value}")
+        return "\n".join(lines) + "\n"
+
+    async def start(self):
+        """Starts the HTTP endpoint and the loop lag sampler."""
+        if self._tasks:
+            return
+        server = await asyncio.start_server(self._serve, self.host, self.port)
+        self._tasks = [asyncio.ensure_future(server.serve_forever()), asyncio.ensure_future(self._sample_lag())]
+        print(f"📈 Metrics on http://{self.host}:{self.port}/metrics")
+
+    async def _sample_lag(self):
+        # how late the loop wakes us up; a blocking call anywhere shows up here
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.lag_interval)
+            self.observe("event_loop_lag_seconds", time.perf_counter() - start - self.lag_interval)
+
+    async def _serve(self, reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass  # skip the headers
+            parts = request.split()
+            if len(parts) > 1 and parts[1] == b"/metrics":
+                status, body = "200 OK", self.render().encode()
+            else:
+                status, body = "404 Not Found", b"try /metrics\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: text/plain; version=0.0.4\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body
+            )
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
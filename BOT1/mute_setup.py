@@ -0,0 +1,100 @@
+import time
+import asyncio
+import discord
+
+MUTE_ROLE = "Muted"
+
+_jobs = {}  # guild_id -> running setup task, so two !mute at once don't set the role up twice
+_forbidden = {}  # guild_id -> ids of channels we aren't allowed to change, not retried on every !mute
+
+
+def needs_overwrite(channel, role):
+    """False when the channel already denies the role, e.g. copied from its category or set by an earlier run."""
+    overwrite = channel.overwrites_for(role)
+    return not (overwrite.send_messages is False and overwrite.speak is False)
+
+
+def missing_overwrites(guild, role):
+    """Channels that don't deny `role` yet, leaving out the ones we weren't allowed to change before."""
+    forbidden = _forbidden.get(guild.id, ())
+    return [c for c in guild.channels if c.id not in forbidden and needs_overwrite(c, role)]
+
+
+async def apply_overwrites(guild, role, concurrency=5, on_progress=None):
+    """Denies sending and speaking for `role` in every channel that doesn't deny it yet.
+
+    Categories go first. Discord copies a category's overwrites to the channels
+    synced with it, so a synced channel whose category denies the role by then
+    is skipped instead of getting a request of its own.
+
+    Up to `concurrency` channels are updated at the same time. Every channel is
+    its own rate limit bucket on Discord's side and discord.py already waits out
+    429s per bucket, so the limit mainly keeps us polite towards the global limit.
+    Returns (updated, skipped, failed).
+    """
+    todo = missing_overwrites(guild, role)
+    categories = [c for c in todo if isinstance(c, discord.CategoryChannel)]
+    # whether a channel is synced has to be known before its category changes
+    synced = {c.id for c in todo if c.category is not None and c.permissions_synced}
+    total = len(todo)  # until the categories are done we don't know how many channels they cover
+    limit = asyncio.Semaphore(concurrency)
+    done = failed = 0
+    denied = {c.id for c in guild.categories if not needs_overwrite(c, role)}  # categories that deny the role
+
+    async def update(channel):
+        nonlocal done, failed
+        async with limit:
+            try:
+                await channel.set_permissions(role, speak=False, send_messages=False, reason="Setting up the Muted role")
+                if isinstance(channel, discord.CategoryChannel):
+                    denied.add(channel.id)
+            except discord.HTTPException as e:
+                failed += 1
+                if isinstance(e, discord.Forbidden):
+                    _forbidden.setdefault(guild.id, set()).add(channel.id)
+                print(f"Couldn't set up {MUTE_ROLE} in #{channel}: {e}")
+            done += 1
+        if on_progress:
+            try:
+                await on_progress(done, total)
+            except discord.HTTPException as e:
+                # only the progress message failed, the channels still get done
+                print(f"Couldn't show the {MUTE_ROLE} setup progress: {e}")
+
+    await asyncio.gather(*(update(c) for c in categories))
+    rest = [c for c in todo
+            if not isinstance(c, discord.CategoryChannel) and not (c.id in synced and c.category_id in denied)]
+    total = len(categories) + len(rest)
+    await asyncio.gather(*(update(c) for c in rest))
+    return done - failed, len(guild.channels) - done, failed
+
+
+async def _set_up(guild, status_channel):
+    role = discord.utils.get(guild.roles, name=MUTE_ROLE) or await guild.create_role(name=MUTE_ROLE)
+    message = await status_channel.send("🔧 Setting up the Muted role...") if status_channel else None
+    last_edit = 0.0
+
+    async def on_progress(done, total):
+        nonlocal last_edit
+        # edit the status message at most every 2 seconds so progress doesn't eat the rate limit itself
+        if message and (done == total or time.monotonic() - last_edit > 2):
+            last_edit = time.monotonic()
+            await message.edit(content=f"🔧 Setting up the Muted role... {done}/{total} channels")
+
+    updated, skipped, failed = await apply_overwrites(guild, role, on_progress=on_progress)
+    if message:
+        await message.edit(content=f"🔧 Muted role ready: {updated} channels updated, {skipped} already fine, {failed} failed.")
+    return role
+
+
+async def ensure_mute_role(guild, status_channel=None):
+    """Returns the guild's Muted role, creating it the first time and adding overwrites to channels that lack them."""
+    role = discord.utils.get(guild.roles, name=MUTE_ROLE)
+    # channels made since the last run (or overwrites someone removed) get fixed on the next !mute
+    if role and guild.id not in _jobs and not missing_overwrites(guild, role):
+        return role
+    if guild.id not in _jobs:
+        task = asyncio.ensure_future(_set_up(guild, status_channel))
+        task.add_done_callback(lambda _: _jobs.pop(guild.id, None))
+        _jobs[guild.id] = task
+    return await asyncio.shield(_jobs[guild.id])
@@ -0,0 +1,149 @@
+import json
+from sqlite_store import open_db, PeriodicFlush
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS polls (
+    message_id INTEGER PRIMARY KEY,
+    channel_id INTEGER NOT NULL,
+    author_id INTEGER NOT NULL,
+    question TEXT NOT NULL,
+    options TEXT NOT NULL,
+    closes REAL NOT NULL,
+    counts TEXT
+);
+CREATE TABLE IF NOT EXISTS votes (
+    message_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    choice INTEGER NOT NULL,
+    PRIMARY KEY (message_id, user_id)
+) WITHOUT ROWID;
+"""
+
+# 👍/👎 for yes/no questions, numbers for everything else
+YES_NO = ["👍", "👎"]
+NUMBERS = ["1️⃣", "2️⃣", "3️⃣", "4️⃣", "5️⃣", "6️⃣", "7️⃣", "8️⃣", "9️⃣", "🔟"]
+
+
+class Poll:
+    __slots__ = ("message_id", "channel_id", "author_id", "question", "options", "emojis", "closes",
+                 "counts", "votes", "changed", "dirty")
+
+    def __init__(self, message_id, channel_id, author_id, question, options, closes):
+        self.message_id = message_id
+        self.channel_id = channel_id
+        self.author_id = author_id
+        self.question = question
+        self.options = options
+        self.emojis = YES_NO if options == ["Yes", "No"] else NUMBERS[:len(options)]
+        self.closes = closes
+        self.counts = [0] * len(options)
+        self.votes = {}  # user_id -> index of the option they voted for, one entry per voter
+        self.changed = False  # the results embed is out of date
+        self.dirty = set()  # user ids whose vote has to be saved (or deleted)
+
+
+class PollStore(PeriodicFlush):
+    """Open polls and their votes, counted in memory from reaction events.
+
+    Each user has at most one vote per poll: reacting with another option moves
+    it, taking away the reaction of the current one removes it. Nothing is
+    fetched from Discord to count. Changed votes are written to SQLite every
+    `checkpoint_interval` seconds, so open polls come back after a restart.
+    """
+
+    what = "poll votes"
+
+    def __init__(self, path="polls.db", checkpoint_interval=10.0):
+        super().__init__(open_db(path, SCHEMA, check_same_thread=False), checkpoint_interval)
+        self.polls = {}  # message_id -> Poll, only the open ones
+        self._writing = set()  # (message_id, user_id) taken by the checkpoint that runs now (or failed)
+        self._load()
+
+    def _load(self):
+        for message_id, channel_id, author_id, question, options, closes in self._db.execute(
+            "SELECT message_id, channel_id, author_id, question, options, closes FROM polls WHERE counts IS NULL"
+        ):
+            self.polls[message_id] = Poll(message_id, channel_id, author_id, question, json.loads(options), closes)
+        for message_id, user_id, choice in self._db.execute("SELECT message_id, user_id, choice FROM votes"):
+            poll = self.polls.get(message_id)
+            if poll:
+                poll.votes[user_id] = choice
+                poll.counts[choice] += 1
+
+    def open(self, message_id, channel_id, author_id, question, options, closes):
+        poll = self.polls[message_id] = Poll(message_id, channel_id, author_id, question, options, closes)
+        with self._lock, self._db:
+            self._db.execute("INSERT INTO polls VALUES (?, ?, ?, ?, ?, ?, NULL)",
+                             (message_id, channel_id, author_id, question, json.dumps(options), closes))
+        return poll
+
+    def vote(self, message_id, user_id, emoji):
+        """Counts a reaction, returns True if it changed the poll's results."""
+        poll = self.polls.get(message_id)
+        if poll is None or emoji not in poll.emojis:
+            return False
+        choice = poll.emojis.index(emoji)
+        old = poll.votes.get(user_id)
+        if old == choice:
+            return False
+        if old is not None:
+            poll.counts[old] -= 1
+        poll.votes[user_id] = choice
+        poll.counts[choice] += 1
+        poll.changed = True
+        poll.dirty.add(user_id)
+        return True
+
+    def unvote(self, message_id, user_id, emoji):
+        """Counts a removed reaction; only taking back your current vote does anything."""
+        poll = self.polls.get(message_id)
+        if poll is None or emoji not in poll.emojis:
+            return False
+        choice = poll.emojis.index(emoji)
+        if poll.votes.get(user_id) != choice:
+            return False  # an old reaction from before they changed their vote
+        del poll.votes[user_id]
+        poll.counts[choice] -= 1
+        poll.changed = True
+        poll.dirty.add(user_id)
+        return True
+
+    def end(self, message_id):
+        """Ends a poll, keeps only its final counts and returns it (or None if it wasn't open)."""
+        poll = self.polls.pop(message_id, None)
+        if poll is None:
+            return None
+        with self._lock, self._db:
+            self._db.execute("UPDATE polls SET counts = ? WHERE message_id = ?", (json.dumps(poll.counts), message_id))
+            self._db.execute("DELETE FROM votes WHERE message_id = ?", (message_id,))
+        return poll
+
+    def _take_batch(self):
+        """Checkpoint: collects every vote that changed since the last one."""
+        for poll in self.polls.values():
+            self._writing.update((poll.message_id, user_id) for user_id in poll.dirty)
+            poll.dirty.clear()
+        saved, removed = [], []
+        for message_id, user_id in self._writing:
+            poll = self.polls.get(message_id)
+            if poll is None:
+                continue  # ended since, end() already dropped its votes
+            choice = poll.votes.get(user_id)
+            if choice is None:
+                removed.append((message_id, user_id))
+            else:
+                saved.append((message_id, user_id, choice))
+        if not saved and not removed:
+            self._writing.clear()
+            return None
+        return saved, removed
+
+    def _write(self, batch):
+        saved, removed = batch
+        with self._db:
+            # a poll can end while its votes wait for the thread, those aren't saved anymore
+            self._db.executemany("INSERT OR REPLACE INTO votes SELECT ?1, ?2, ?3 WHERE EXISTS "
+                                 "(SELECT 1 FROM polls WHERE message_id = ?1 AND counts IS NULL)", saved)
+            self._db.executemany("DELETE FROM votes WHERE message_id = ? AND user_id = ?", removed)
+        self._writing = set()  # only dropped once they are safely written
+
@@ -0,0 +1,130 @@
+import json
+import time
+import heapq
+import asyncio
+from sqlite_store import open_db
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    due REAL NOT NULL,
+    kind TEXT NOT NULL,
+    key TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key);
+"""
+
+
+class Scheduler:
+    """Runs timed jobs (reminders, unmutes, ...) from one background task, and remembers them across restarts.
+
+    Every job is a row in SQLite. In memory we only keep a heap of (due, id)
+    pairs, so a pending job costs about a hundred bytes instead of a sleeping task.
+    Due jobs are fired in batches of up to `batch_size`. Each kind of job needs a
+    handler registered with `on(kind)` that gets the job's payload dict.
+    """
+
+    def __init__(self, path="schedule.db", batch_size=100):
+        self.batch_size = batch_size
+        self.handlers = {}
+        self._heap = []  # (due, job_id), cancelled jobs stay in here until they come up and get skipped
+        self._parked = {}  # kind -> [(due, job_id)] of jobs that came up while that kind had no handler
+        self._wakeup = asyncio.Event()
+        self._task = None
+
+        self._db = open_db(path, SCHEMA)  # WAL, so no fsync per reminder
+
+    def on(self, kind):
+        """Decorator that registers the handler for a kind of job.
+
+        Jobs of that kind that came up while nobody handled them (their cog
+        was unloaded) run right after.
+        """
+        def register(handler):
+            self.handlers[kind] = handler
+            parked = self._parked.pop(kind, None)
+            if parked:
+                for entry in parked:
+                    heapq.heappush(self._heap, entry)
+                self._wakeup.set()
+            return handler
+        return register
+
+    def add(self, kind, seconds, payload, key=None):
+        """Schedules a job `seconds` from now and returns its id."""
+        due = time.time() + seconds
+        with self._db:
+            job_id = self._db.execute(
+                "INSERT INTO jobs (due, kind, key, payload) VALUES (?, ?, ?, ?)",
+                (due, kind, key, json.dumps(payload)),
+            ).lastrowid
+        if not self._heap or due < self._heap[0][0]:
+            self._wakeup.set()  # the runner is sleeping until a later job, make it look again
+        heapq.heappush(self._heap, (due, job_id))
+        return job_id
+
+    def get(self, job_id):
+        """Returns (kind, payload) of a pending job, or None."""
+        row = self._db.execute("SELECT kind, payload FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return (row[0], json.loads(row[1])) if row else None
+
+    def cancel(self, job_id):
+        """Cancels a pending job, returns False if there was nothing to cancel."""
+        with self._db:
+            return self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,)).rowcount > 0
+
+    def cancel_key(self, key):
+        """Cancels every pending job with this key, returns their payloads."""
+        with self._db:
+            rows = self._db.execute("SELECT payload FROM jobs WHERE key = ?", (key,)).fetchall()
+            self._db.execute("DELETE FROM jobs WHERE key = ?", (key,))
+        return [json.loads(payload) for payload, in rows]
+
+    def __len__(self):
+        return self._db.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+
+    def start(self):
+        """Loads saved jobs and starts running them, safe to call more than once (on_ready can fire again)."""
+        if self._task is not None:
+            return
+        self._heap = self._db.execute("SELECT due, id FROM jobs").fetchall()
+        heapq.heapify(self._heap)
+        self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            delay = self._heap[0][0] - time.time() if self._heap else None
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue  # look at the heap again, something may have been added
+
+            ids = []
+            now = time.time()
+            while self._heap and self._heap[0][0] <= now and len(ids) < self.batch_size:
+                ids.append(heapq.heappop(self._heap)[1])
+            await self._fire(ids)
+
+    async def _fire(self, ids):
+        marks = ",".join("?" * len(ids))
+        with self._db:
+            # cancelled jobs are already gone from the table, so they just don't come back here
+            rows = self._db.execute(f"SELECT id, due, kind, payload FROM jobs WHERE id IN ({marks})", ids).fetchall()
+            # jobs nobody handles right now (their cog isn't loaded) stay saved and wait for on(kind)
+            for job_id, due, kind, _ in rows:
+                if kind not in self.handlers:
+                    self._parked.setdefault(kind, []).append((due, job_id))
+            rows = [(job_id, kind, payload) for job_id, _, kind, payload in rows if kind in self.handlers]
+            self._db.executemany("DELETE FROM jobs WHERE id = ?", [(job_id,) for job_id, _, _ in rows])
+
+        results = await asyncio.gather(
+            *(self.handlers[kind](json.loads(payload)) for _, kind, payload in rows),
+            return_exceptions=True,
+        )
+        for (job_id, kind, _), result in zip(rows, results):
+            if isinstance(result, Exception):
+                print(f"Scheduled {kind} job {job_id} failed: {result}")
@@ -0,0 +1,133 @@
+from sqlite_store import open_db, PeriodicFlush
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    guild_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    epoch INTEGER NOT NULL,
+    wins INTEGER NOT NULL,
+    losses INTEGER NOT NULL,
+    ties INTEGER NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+);
+CREATE INDEX IF NOT EXISTS scores_leaderboard ON scores (guild_id, epoch, wins DESC, user_id);
+CREATE TABLE IF NOT EXISTS epochs (
+    guild_id INTEGER PRIMARY KEY,
+    epoch INTEGER NOT NULL
+);
+"""
+
+# adds the buffered counts to what is stored, or replaces it if the row is from before the last reset
+UPSERT = """
+INSERT INTO scores (guild_id, user_id, epoch, wins, losses, ties) VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (guild_id, user_id) DO UPDATE SET
+    wins = CASE WHEN epoch = excluded.epoch THEN wins + excluded.wins ELSE excluded.wins END,
+    losses = CASE WHEN epoch = excluded.epoch THEN losses + excluded.losses ELSE excluded.losses END,
+    ties = CASE WHEN epoch = excluded.epoch THEN ties + excluded.ties ELSE excluded.ties END,
+    epoch = excluded.epoch
+"""
+
+RESULTS = {"win": 0, "lose": 1, "tie": 2}
+
+
+class ScoreStore(PeriodicFlush):
+    """Wins, losses and ties per server and user, kept in SQLite.
+
+    Games only bump counters in memory; a background task writes all of them in
+    one transaction every `flush_interval` seconds. Reads add the counters that
+    aren't written yet. Resetting a server just moves it to a new "epoch": old rows are
+    ignored from then on and get overwritten the next time that user plays, so
+    nothing has to be deleted right away.
+    """
+
+    what = "scores"
+
+    def __init__(self, path="scores.db", flush_interval=5.0):
+        super().__init__(open_db(path, SCHEMA, check_same_thread=False), flush_interval)
+        self._pending = {}  # guild_id -> {user_id: [wins, losses, ties]} not written yet
+        self._writing = {}  # the same, taken by the write that runs now (or failed, then it is retried)
+        self._epochs = {}
+
+    def _epoch(self, guild_id):
+        if guild_id not in self._epochs:
+            row = self._db.execute("SELECT epoch FROM epochs WHERE guild_id = ?", (guild_id,)).fetchone()
+            self._epochs[guild_id] = row[0] if row else 0
+        return self._epochs[guild_id]
+
+    def _unwritten(self, guild_id):
+        """{user_id: [wins, losses, ties]} of a server's games that aren't in the table yet."""
+        counts = {}
+        for buffer in (self._writing, self._pending):
+            for user_id, new in buffer.get(guild_id, {}).items():
+                total = counts.setdefault(user_id, [0, 0, 0])
+                for i, n in enumerate(new):
+                    total[i] += n
+        return counts
+
+    def _stored(self, guild_id, user_id):
+        return self._db.execute(
+            "SELECT wins, losses, ties FROM scores WHERE guild_id = ? AND user_id = ? AND epoch = ?",
+            (guild_id, user_id, self._epoch(guild_id)),
+        ).fetchone() or (0, 0, 0)
+
+    def record(self, guild_id, user_id, result):
+        """Counts a "win", "lose" or "tie" for a user."""
+        counts = self._pending.setdefault(guild_id, {}).setdefault(user_id, [0, 0, 0])
+        counts[RESULTS[result]] += 1
+
+    def get(self, guild_id, user_id):
+        """Returns {"wins", "losses", "ties"} for a user, including games not written yet."""
+        with self._lock:
+            pending = self._unwritten(guild_id).get(user_id, (0, 0, 0))
+            wins, losses, ties = (stored + new for stored, new in zip(self._stored(guild_id, user_id), pending))
+        return {"wins": wins, "losses": losses, "ties": ties}
+
+    def top(self, guild_id, limit=10):
+        """The server's best players by wins as (user_id, wins, losses, ties), including games not written yet."""
+        with self._lock:
+            unwritten = self._unwritten(guild_id)
+            # read from the index, with enough extra rows that `limit` of them are
+            # players whose counts don't change below
+            rows = self._db.execute(
+                "SELECT user_id, wins, losses, ties FROM scores WHERE guild_id = ? AND epoch = ? "
+                "ORDER BY wins DESC, user_id LIMIT ?",
+                (guild_id, self._epoch(guild_id), limit + len(unwritten)),
+            ).fetchall()
+            totals = {user_id: tuple(counts) for user_id, *counts in rows}
+            for user_id, new in unwritten.items():
+                stored = totals.get(user_id) or self._stored(guild_id, user_id)
+                totals[user_id] = tuple(old + n for old, n in zip(stored, new))
+        best = sorted(totals.items(), key=lambda item: (-item[1][0], item[0]))[:limit]
+        return [(user_id, *counts) for user_id, counts in best]
+
+    def reset(self, guild_id):
+        """Clears a server's scores without touching its rows."""
+        with self._lock:
+            epoch = self._epoch(guild_id) + 1
+            with self._db:
+                self._db.execute("INSERT OR REPLACE INTO epochs VALUES (?, ?)", (guild_id, epoch))
+            self._epochs[guild_id] = epoch
+            self._pending.pop(guild_id, None)
+            self._writing.pop(guild_id, None)
+
+    def _take_batch(self):
+        """Moves the new counters into _writing and returns the rows to write for all of it."""
+        with self._lock:
+            for guild_id, users in self._pending.items():
+                for user_id, new in users.items():
+                    counts = self._writing.setdefault(guild_id, {}).setdefault(user_id, [0, 0, 0])
+                    for i, n in enumerate(new):
+                        counts[i] += n
+            self._pending = {}
+            return [
+                (guild_id, user_id, self._epoch(guild_id), *counts)
+                for guild_id, users in self._writing.items()
+                for user_id, counts in users.items()
+            ]
+
+    def _write(self, rows):
+        with self._db:
+            self._db.executemany(UPSERT, rows)
+        # only dropped once they are safely written, and with the lock still held,
+        # so a read never sees them both in the table and here
+        self._writing = {}
@@ -0,0 +1,88 @@
+import abc
+import asyncio
+import sqlite3
+import threading
+
+
+def open_db(path, schema, check_same_thread=True):
+    """Opens (or creates) a SQLite file the way all our stores use it, with its tables made.
+
+    WAL lets reads go on while something is written, and with WAL
+    synchronous=NORMAL is still safe: no fsync per commit, and a power cut can
+    only lose the last commits, it can't corrupt the file.
+    """
+    db = sqlite3.connect(path, check_same_thread=check_same_thread)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    db.executescript(schema)
+    return db
+
+
+class PeriodicFlush(abc.ABC):
+    """Base for stores that keep changes in memory and write them from one background task.
+
+    A subclass passes its database to __init__ and implements two steps:
+    _take_batch() runs on the event loop and turns what changed into plain rows
+    (or returns None when nothing did), _write(batch) writes those in one
+    transaction. Every `flush_interval` seconds the batch is written from a
+    worker thread, so the disk never holds up the event loop; flush() does both
+    steps right away. The connection is shared with that thread, so everything
+    else that uses it holds `_lock`. close() waits for a write that is still
+    running, stops the task, flushes once more and closes the database.
+    """
+
+    what = "data"  # for the error message
+
+    def __init__(self, db, flush_interval=5.0):
+        self._db = db  # opened with check_same_thread=False, or None to keep nothing
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._task = None
+
+    @abc.abstractmethod
+    def _take_batch(self):
+        """Collects the pending changes on the event loop, returns them or None."""
+
+    @abc.abstractmethod
+    def _write(self, batch):
+        """Writes a batch from _take_batch() in one transaction, called with `_lock` held."""
+
+    def start(self):
+        """Starts the background writer, safe to call more than once."""
+        if self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                batch = self._take_batch()
+                if batch:
+                    await asyncio.to_thread(self._write_locked, batch)
+            except sqlite3.Error as e:
+                print(f"Failed to save {self.what}: {e}")
+
+    def _write_locked(self, batch):
+        with self._lock:
+            if self._db is None:
+                return  # closed while this batch waited for its thread, close() saved newer state
+            self._write(batch)
+
+    def flush(self):
+        """Writes everything pending now, on the calling thread."""
+        batch = self._take_batch()
+        if batch:
+            self._write_locked(batch)
+
+    def close(self):
+        """Writes whatever is still pending and closes the database."""
+        # cancelling the task doesn't stop a batch its thread is writing: wait for that one
+        # first, so the state saved here lands last and nothing is written after closing
+        with self._lock:
+            if self._task is not None:
+                self._task.cancel()
+                self._task = None
+            if self._db is not None:
+                self.flush()
+                self._db.close()
+                self._db = None
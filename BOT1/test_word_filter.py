@@ -0,0 +1,34 @@
+# The bad word filter catches what it should and leaves the rest alone.
+#
+# usage: python -m pytest BOT1/test_word_filter.py
+import pytest
+from word_filter import WordFilter, SMALL_LIST
+
+WORDS = ["idiot", "dumb", "shit", "ass"]
+
+# (message, whole words?, the word it should find or None)
+CASES = [
+    ("you idiot", True, "idiot"),
+    ("you idiot!", True, "idiot"),  # punctuation after the word is still punctuation
+    ("so dumb!!", True, "dumb"),
+    ("shit$", True, "shit"),
+    ("(idiot)", True, "idiot"),
+    ("idiot... ok", True, "idiot"),
+    ("sh!t", True, "shit"),
+    ("5h!t", True, "shit"),
+    ("1d10t", True, "idiot"),
+    ("ÏD10T", True, "idiot"),
+    ("d|_|mb", True, None),
+    ("that's a class act", True, None),
+    ("that's a class act", False, "ass"),
+    ("you idiot!", False, "idiot"),
+    ("hello there!", False, None),
+]
+
+
+# the same cases through the short list path and through the compiled pattern
+@pytest.mark.parametrize("words", [WORDS, WORDS + [f"zzfiller{i}" for i in range(SMALL_LIST)]],
+                         ids=["short list", "pattern"])
+@pytest.mark.parametrize("text, whole_words, expected", CASES)
+def test_find(words, text, whole_words, expected):
+    assert WordFilter(words, whole_words=whole_words).find(text) == expected
@@ -0,0 +1,133 @@
+import os
+import re
+import time
+import unicodedata
+
+# common look-alike characters people use to sneak words past the filter
+LEET = str.maketrans({
+    "0": "o", "1": "i", "3": "e", "4": "a", "5": "s", "7": "t", "8": "b", "9": "g",
+})
+ASCII_LEET = bytes.maketrans(b"01345789", b"oieastbg")  # the same as bytes, translating bytes is a lot faster
+# these are also ordinary punctuation, so they only count as letters inside a word:
+# "sh!t" is "shit", but the "!" in "you idiot!" stays a "!"
+SYMBOLS = str.maketrans({"!": "i", "|": "i", "@": "a", "$": "s", "+": "t"})
+SYMBOL = re.compile(r"[!|@$+]")
+IN_WORD_SYMBOLS = re.compile(r"(?<=\w)[!|@$+]+(?=\w)")
+
+# up to this many words a plain substring check is faster than the compiled pattern
+SMALL_LIST = 32
+
+
+def _letters(match):
+    return match.group().translate(SYMBOLS)
+
+
+def normalize(text):
+    """Lowercases text and undoes accents and leetspeak, so "ÏD10T" and "idiot" look the same."""
+    if text.isascii():
+        # most messages, skips the slow unicode work
+        text = text.lower().encode("ascii").translate(ASCII_LEET).decode("ascii")
+    else:
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+        text = text.casefold().translate(LEET)
+    if SYMBOL.search(text):  # checking first is cheaper than the lookbehind at every position
+        text = IN_WORD_SYMBOLS.sub(_letters, text)
+    return text
+
+
+def _trie_pattern(words):
+    """Builds one regex for all words, shaped like a trie so shared prefixes are only checked once.
+
+    ["shit", "shite", "stupid"] becomes s(?:hit(?:e)?|tupid), which the regex engine
+    walks as a single automaton instead of trying every word one after another.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}  # marks the end of a word
+
+    def build(node):
+        ends_here = "" in node
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        if ends_here:
+            body = "(?:" + body + ")?"
+        return body
+
+    return build(trie)
+
+
+class WordFilter:
+    """Checks messages against a list of bad words using a single compiled pattern.
+
+    With `whole_words` on, "class" no longer matches "ass". If `path` is given the
+    list is read from that file (one word per line) and re-read whenever the file
+    changes, checked at most every `reload_interval` seconds.
+
+    Short lists (up to SMALL_LIST words) are checked with plain `in` first, which
+    is faster than the pattern at that size; the pattern then only runs to
+    confirm a hit in whole-word mode.
+    """
+
+    def __init__(self, words=(), path=None, whole_words=False, reload_interval=5.0):
+        self.path = path
+        self.whole_words = whole_words
+        self.reload_interval = reload_interval
+        self._mtime = None
+        self._checked_at = 0.0
+        self._pattern = None
+        self.words = []
+        if path and os.path.exists(path):
+            self._reload()
+        else:
+            self.set_words(words)
+
+    def set_words(self, words):
+        self.words = sorted({normalize(w.strip()) for w in words if w.strip()})
+        if not self.words:
+            self._pattern = None
+            return
+        pattern = _trie_pattern(self.words)
+        if self.whole_words:
+            pattern = r"(?<!\w)" + pattern + r"(?!\w)"
+        self._pattern = re.compile(pattern)
+
+    def _reload(self):
+        self._mtime = os.path.getmtime(self.path)
+        with open(self.path, encoding="utf-8") as f:
+            self.set_words(line for line in f if not line.startswith("#"))
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return
+        self._checked_at = now
+        try:
+            if os.path.getmtime(self.path) != self._mtime:
+                self._reload()
+                print(f"Reloaded {len(self.words)} filtered words from {self.path}")
+        except OSError:
+            pass  # file missing or being rewritten, keep the current list
+
+    def find(self, text):
+        """Returns the first bad word in `text`, or None if it is clean."""
+        if self.path:
+            self._maybe_reload()
+        if self._pattern is None:
+            return None
+        text = normalize(text)
+        if len(self.words) <= SMALL_LIST:
+            for word in self.words:
+                if word in text:
+                    break
+            else:
+                return None
+            if not self.whole_words:
+                return word
+        match = self._pattern.search(text)
+        return match.group() if match else None
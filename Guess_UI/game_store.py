@@ -0,0 +1,118 @@
+import time
+from collections import OrderedDict
+from sqlite_store import open_db, PeriodicFlush
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    user_id INTEGER PRIMARY KEY,
+    secret_number INTEGER NOT NULL,
+    attempts INTEGER NOT NULL,
+    touched REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_touched ON games (touched);
+"""
+
+
+class Game:
+    __slots__ = ("secret_number", "attempts", "touched")
+
+    def __init__(self, secret_number, attempts=0, touched=None):
+        self.secret_number = secret_number
+        self.attempts = attempts
+        self.touched = touched or time.time()
+
+
+class GameStore(PeriodicFlush):
+    """Running guessing games by user id. Games nobody touched for `ttl` seconds are dropped.
+
+    Games are kept oldest-touched first, so the sweeper (one background task,
+    every `sweep_interval` seconds) only looks at the games it actually drops.
+    With a `path` the games are also saved to SQLite in the same sweep and are
+    read back one at a time when a player shows up again after a restart.
+    """
+
+    what = "guessing games"
+
+    def __init__(self, path=None, ttl=30 * 60, sweep_interval=10.0):
+        super().__init__(open_db(path, SCHEMA, check_same_thread=False) if path else None, sweep_interval)
+        self.ttl = ttl
+        self._games = OrderedDict()  # user_id -> Game, least recently touched first
+        self._dirty = set()  # user ids whose row has to be written or deleted
+        self._writing = set()  # the same, taken by the save that runs now (or failed)
+
+    def get(self, user_id):
+        """Returns the user's Game, or None if they have none (or it expired)."""
+        game = self._games.get(user_id)
+        if game is None and self._db is not None and user_id not in self._dirty | self._writing:
+            # not seen since the restart, maybe it was saved
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT secret_number, attempts, touched FROM games WHERE user_id = ?", (user_id,)
+                ).fetchone()
+            if row and row[2] + self.ttl >= time.time():
+                # counts as touched now, which keeps the oldest-first order right
+                game = self._games[user_id] = Game(row[0], row[1])
+                self._dirty.add(user_id)
+        if game is not None and game.touched + self.ttl < time.time():
+            self.end(user_id)
+            return None
+        return game
+
+    def __contains__(self, user_id):
+        return self.get(user_id) is not None
+
+    def __len__(self):
+        return len(self._games)
+
+    def new_game(self, user_id, secret_number):
+        self._games.pop(user_id, None)
+        self._games[user_id] = Game(secret_number)
+        self._dirty.add(user_id)
+
+    def touch(self, user_id):
+        """Counts a guess and keeps the game alive."""
+        game = self._games[user_id]
+        game.attempts += 1
+        game.touched = time.time()
+        self._games.move_to_end(user_id)
+        self._dirty.add(user_id)
+
+    def end(self, user_id):
+        self._games.pop(user_id, None)
+        self._dirty.add(user_id)
+
+    def sweep(self):
+        """Drops expired games, returns how many were dropped."""
+        cutoff = time.time() - self.ttl
+        dropped = 0
+        while self._games:
+            user_id, game = next(iter(self._games.items()))
+            if game.touched >= cutoff:
+                break  # everything after this one was touched later
+            del self._games[user_id]
+            self._dirty.discard(user_id)
+            dropped += 1
+        return dropped
+
+    def _take_batch(self):
+        """Sweeps, then collects the games that changed since the last save."""
+        cutoff = time.time() - self.ttl  # before the sweep, so every row older than this is swept too
+        self.sweep()
+        if self._db is None:
+            self._dirty.clear()
+            return None
+        self._writing |= self._dirty
+        self._dirty = set()
+        saved = [(user_id, game.secret_number, game.attempts, game.touched)
+                 for user_id in self._writing if (game := self._games.get(user_id))]
+        ended = [(user_id,) for user_id in self._writing if user_id not in self._games]
+        # the swept games go by their age, they were dropped from _dirty
+        return saved, ended, cutoff
+
+    def _write(self, batch):
+        saved, ended, cutoff = batch
+        with self._db:
+            self._db.executemany("INSERT OR REPLACE INTO games VALUES (?, ?, ?, ?)", saved)
+            self._db.executemany("DELETE FROM games WHERE user_id = ?", ended)
+            self._db.execute("DELETE FROM games WHERE touched < ?", (cutoff,))
+        self._writing = set()  # only dropped once they are safely written
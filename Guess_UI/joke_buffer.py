@@ -0,0 +1,163 @@
+import asyncio
+import logging
+from collections import deque
+import aiohttp
+
+log = logging.getLogger("jokes")
+
+JOKE_URL = "https://v2.jokeapi.dev/joke"
+
+
+def joke_text(data):
+    """Turns one JokeAPI joke into the text we send, or None if it isn't one."""
+    # Check the type of joke returned
+    if data.get("type") == "single":
+        return data.get("joke")
+    if data.get("type") == "twopart":
+        return f"{data.get('setup')}\n{data.get('delivery')}"
+    return None
+
+
+class JokeBuffer:
+    """Jokes fetched ahead of time, so !joke answers straight from memory.
+
+    One pooled aiohttp session is kept for the bot's whole life (no new TCP/TLS
+    handshake per joke), and a background task tops the buffer back up to `depth`
+    jokes, asking the API for several at once. Jokes we handed out recently are
+    skipped.
+
+    When nothing fitting is buffered, the API is asked directly but only given
+    `budget` seconds; after that the local `corpus` answers, so a slow or dead
+    API never makes !joke slow. A late API answer still ends up in the buffer.
+    """
+
+    def __init__(self, url=JOKE_URL, depth=10, budget=0.15, corpus=None, blacklist=(), history=200):
+        self.url = url
+        self.depth = depth
+        self.budget = budget
+        self.corpus = corpus
+        self.blacklist = list(blacklist)  # JokeAPI flags we never want (nsfw, religious, political, ...)
+        self._jokes = deque()  # (key, category, text), oldest first
+        self._recent = deque(maxlen=history)  # keys handed out lately, oldest falls out first
+        self._recent_keys = set()
+        self._wanted = asyncio.Event()
+        self._session = None
+        self._task = None
+        self.hits = 0  # answered from the buffer
+        self.remote = 0  # answered by the API within the budget
+        self.local = 0  # answered from the corpus
+
+    def start(self):
+        """Opens the session and starts filling the buffer, safe to call more than once."""
+        if self._task is not None:
+            return
+        self._session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=10),
+            connector=aiohttp.TCPConnector(limit=4, keepalive_timeout=60),
+        )
+        self._task = asyncio.ensure_future(self._refill())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def __len__(self):
+        return len(self._jokes)
+
+    async def get(self, channel_id=None, category=None):
+        """Returns a joke (of `category`, if given): buffered, from the API within the budget, or local."""
+        self.start()
+        self._wanted.set()  # either way the buffer needs topping up
+        text = self._take(category)
+        if text:
+            self.hits += 1
+            return text
+
+        fetch = asyncio.ensure_future(self._fetch(1, category))
+        done, _ = await asyncio.wait({fetch}, timeout=self.budget)
+        if done and not fetch.exception() and fetch.result():
+            self.remote += 1
+            key, _, text = fetch.result()[0]
+            self._remember(key)
+            return text
+        if not done:
+            fetch.add_done_callback(self._keep_late)
+        elif fetch.exception():
+            e = fetch.exception()
+            log.warning("Joke API error: %s: %s", type(e).__name__, e)
+        else:
+            # answered fine, but nothing in it was a joke we can send (e.g. all blacklisted)
+            log.info("The joke API sent no usable joke for category %s", category or "Any")
+
+        self.local += 1
+        text = self.corpus.pick(channel_id, category, self.blacklist) if self.corpus else None
+        return text or "Oops! Couldn't fetch a joke this time."
+
+    def _take(self, category):
+        for entry in self._jokes:
+            if category is None or entry[1] == category.lower():
+                self._jokes.remove(entry)
+                self._remember(entry[0])
+                return entry[2]
+        return None
+
+    def _remember(self, key):
+        if len(self._recent) == self._recent.maxlen:
+            self._recent_keys.discard(self._recent[0])
+        self._recent.append(key)
+        self._recent_keys.add(key)
+
+    def _add(self, jokes):
+        queued = {entry[0] for entry in self._jokes}
+        added = 0
+        for entry in jokes:
+            if entry[0] not in queued and entry[0] not in self._recent_keys and len(self._jokes) < self.depth:
+                self._jokes.append(entry)
+                queued.add(entry[0])
+                added += 1
+        return added
+
+    def _keep_late(self, fetch):
+        # the API answered after we had already sent a local joke, keep it for next time
+        if not fetch.cancelled() and not fetch.exception():
+            self._add(fetch.result())
+
+    async def _fetch(self, amount, category=None):
+        # JokeAPI hands out up to 10 jokes per request
+        params = {"amount": amount} if amount > 1 else {}
+        if self.blacklist:
+            params["blacklistFlags"] = ",".join(self.blacklist)
+        async with self._session.get(f"{self.url}/{category or 'Any'}", params=params) as response:
+            response.raise_for_status()  # a 503 page isn't JSON, say what really went wrong
+            data = await response.json(content_type=None)
+        if data.get("error"):
+            raise ValueError(data.get("message", "the joke API had an issue"))
+        jokes = []
+        for item in data.get("jokes", [data]):
+            text = joke_text(item)
+            if text:
+                jokes.append((item.get("id", text), str(item.get("category", "")).lower(), text))
+        return jokes
+
+    async def _refill(self):
+        failures = 0
+        while True:
+            missing = self.depth - len(self._jokes)
+            if missing <= 0:
+                self._wanted.clear()
+                await self._wanted.wait()
+                continue
+            try:
+                jokes = await self._fetch(min(missing, 10))
+                failures = 0
+            except (asyncio.TimeoutError, aiohttp.ClientError, ValueError) as e:
+                failures += 1
+                log.warning("Couldn't refill the joke buffer: %s: %s", type(e).__name__, e)
+                await asyncio.sleep(min(60, 2 ** failures))  # back off while the API is down
+                continue
+            if not self._add(jokes):
+                await asyncio.sleep(1)  # only repeats came back, don't hammer the API
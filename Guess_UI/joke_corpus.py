@@ -0,0 +1,58 @@
+import json
+import random
+from collections import OrderedDict
+
+
+class JokeCorpus:
+    """Our own jokes, indexed by category and flag so picking one never scans the whole list.
+
+    Every channel (and filter combination) gets its own shuffled rotation, so a
+    channel sees every matching joke once before any of them comes back. Only
+    the `max_rotations` most recently used rotations are kept.
+    """
+
+    def __init__(self, jokes, max_rotations=1000):
+        self.texts = []
+        self.by_category = {}  # "programming" -> [joke ids]
+        self.flagged = {}  # "nsfw" -> {joke ids}
+        self.max_rotations = max_rotations
+        self._rotations = OrderedDict()  # (channel_id, category, flags) -> [shuffled ids, next position]
+        for joke in jokes:
+            joke_id = len(self.texts)
+            self.texts.append(joke["joke"])
+            self.by_category.setdefault(joke["category"].lower(), []).append(joke_id)
+            for flag in joke.get("flags", ()):
+                self.flagged.setdefault(flag, set()).add(joke_id)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def __len__(self):
+        return len(self.texts)
+
+    def _candidates(self, category, blacklist):
+        ids = self.by_category.get(category.lower(), []) if category else range(len(self.texts))
+        excluded = set().union(*(self.flagged.get(flag, ()) for flag in blacklist))
+        return [joke_id for joke_id in ids if joke_id not in excluded]
+
+    def pick(self, channel_id=None, category=None, blacklist=()):
+        """Returns the channel's next joke for these filters, or None if nothing matches."""
+        key = (channel_id, category and category.lower(), frozenset(blacklist))
+        rotation = self._rotations.get(key)
+        if rotation is None or rotation[1] >= len(rotation[0]):
+            ids = self._candidates(category, blacklist)
+            if not ids:
+                return None
+            random.shuffle(ids)
+            if rotation and len(ids) > 1 and ids[0] == rotation[0][-1]:
+                ids[0], ids[-1] = ids[-1], ids[0]  # no repeat across the reshuffle either
+            rotation = self._rotations[key] = [ids, 0]
+        self._rotations.move_to_end(key)
+        while len(self._rotations) > self.max_rotations:
+            self._rotations.popitem(last=False)
+
+        joke_id = rotation[0][rotation[1]]
+        rotation[1] += 1
+        return self.texts[joke_id]
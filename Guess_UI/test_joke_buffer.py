@@ -0,0 +1,98 @@
+# JokeBuffer against a fake joke API on localhost, no internet needed.
+# The fake API is fast, then slow (2 s), then down, and !joke has to stay
+# quick in all three.
+#
+# usage: python -m pytest Guess_UI/test_joke_buffer.py
+import os
+import time
+import asyncio
+import itertools
+import pytest
+from aiohttp import web
+from joke_buffer import JokeBuffer
+from joke_corpus import JokeCorpus
+
+CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), "jokes.json")
+BUDGET = 0.15
+
+
+def fake_api(mode):
+    ids = itertools.count()
+
+    def joke(category):
+        return {"type": "single", "id": next(ids), "category": category, "joke": "from the api"}
+
+    async def handler(request):
+        if mode["down"]:
+            raise web.HTTPServiceUnavailable()
+        await asyncio.sleep(mode["delay"])
+        amount = int(request.query.get("amount", 1))
+        category = "Pun" if request.match_info["category"] == "Any" else request.match_info["category"]
+        if amount > 1:
+            return web.json_response({"amount": amount, "jokes": [joke(category) for _ in range(amount)]})
+        return web.json_response(joke(category))
+
+    app = web.Application()
+    app.router.add_get("/joke/{category}", handler)
+    return app
+
+
+async def with_api(test, delay=0, down=False):
+    """Runs `test(url)` with the fake API serving on a free port."""
+    runner = web.AppRunner(fake_api({"delay": delay, "down": down}))
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", 0).start()
+    host, port = runner.addresses[0][:2]
+    try:
+        return await test(f"http://{host}:{port}/joke")
+    finally:
+        await runner.cleanup()
+
+
+# (delay, down, where the answers should come from)
+@pytest.mark.parametrize("delay, down, expected", [(0, False, "remote"), (2, False, "local"), (0, True, "local")],
+                         ids=["fast", "slow", "down"])
+def test_stays_quick(delay, down, expected):
+    async def test(url):
+        # depth=0 so every !joke goes past the buffer to the API
+        jokes = JokeBuffer(url, depth=0, budget=BUDGET, corpus=JokeCorpus.load(CORPUS))
+        slowest = 0.0
+        try:
+            for _ in range(20):
+                started = time.perf_counter()
+                assert await jokes.get(1, "Programming")
+                slowest = max(slowest, time.perf_counter() - started)
+        finally:
+            await jokes.close()
+        assert {"remote": jokes.remote, "local": jokes.local}[expected] == 20
+        assert slowest < BUDGET + 0.1
+
+    asyncio.run(with_api(test, delay, down))
+
+
+def test_buffered_jokes_are_used_once():
+    async def test(url):
+        jokes = JokeBuffer(url, depth=5, budget=BUDGET, corpus=JokeCorpus.load(CORPUS))
+        jokes.start()
+        for _ in range(50):
+            if len(jokes) == 5:
+                break
+            await asyncio.sleep(0.02)
+        texts = [await jokes.get(1) for _ in range(5)]
+        await jokes.close()
+        assert jokes.hits == 5 and all(texts)
+
+    asyncio.run(with_api(test))
+
+
+def test_close_while_empty():
+    async def test(url):
+        # an empty buffer is falsy, but its session still has to be closed
+        jokes = JokeBuffer(url, depth=5, budget=BUDGET, corpus=JokeCorpus.load(CORPUS))
+        jokes.start()
+        jokes._jokes.clear()
+        session = jokes._session
+        await jokes.close()
+        assert not len(jokes) and session.closed
+
+    asyncio.run(with_api(test))
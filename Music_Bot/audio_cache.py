@@ -0,0 +1,150 @@
+import os
+import mmap
+import asyncio
+import hashlib
+from collections import OrderedDict
+import discord
+from discord.oggparse import OggStream
+
+
+class CachedOpusAudio(discord.AudioSource):
+    """Plays an Ogg/Opus file from the cache without ffmpeg, straight out of a memory map."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._packets = OggStream(self._map).iter_packets()
+
+    def read(self):
+        return next(self._packets, b"")
+
+    def is_opus(self):
+        return True
+
+    def cleanup(self):
+        self._packets = iter(())
+        self._map.close()
+        self._file.close()
+
+
+class AudioCache:
+    """Keeps Ogg/Opus copies of often played songs on disk, within a byte budget.
+
+    A song gets cached once it has been played `min_plays` times. When the cache
+    goes over `max_bytes` the least recently used ("lru") or least often played
+    ("lfu") file is deleted. Works the same with local files as with URLs, so it
+    can be tried out offline with a folder of test songs.
+    """
+
+    def __init__(self, directory, max_bytes=2 * 1024 ** 3, min_plays=2, policy="lru", encoders=2):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_plays = min_plays
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # file name -> [size, plays], oldest use first
+        self._size = 0
+        self._plays = {}  # how often not-yet-cached songs were played
+        self._filling = set()
+        self._encoders = asyncio.Semaphore(encoders)  # ffmpeg runs we allow at once
+
+        os.makedirs(directory, exist_ok=True)
+        # pick up what an earlier run left behind, oldest first so LRU order survives restarts
+        found = []
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".tmp"):
+                os.remove(path)  # half written by a crash
+            elif name.endswith(".opus"):
+                stat = os.stat(path)
+                found.append((stat.st_mtime, name, stat.st_size))
+        for _, name, size in sorted(found):
+            self._entries[name] = [size, 0]
+            self._size += size
+        self._evict()
+
+    @staticmethod
+    def _name(key):
+        return hashlib.sha1(key.encode()).hexdigest() + ".opus"
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        return (f"{len(self._entries)} songs, {self._size / 1024 ** 2:.1f}/{self.max_bytes / 1024 ** 2:.0f} MB, "
+                f"hit rate {self.hit_rate:.0%} ({self.hits}/{self.hits + self.misses})")
+
+    def open(self, key):
+        """Returns a ready to play source for `key`, or None when it isn't cached."""
+        name = self._name(key)
+        entry = self._entries.get(name)
+        if entry is None:
+            self.misses += 1
+            return None
+        try:
+            source = CachedOpusAudio(os.path.join(self.directory, name))
+        except (OSError, ValueError):
+            self._forget(name)
+            self.misses += 1
+            return None
+        entry[1] += 1
+        self._entries.move_to_end(name)
+        self.hits += 1
+        return source
+
+    def record_play(self, key, url, codec=None):
+        """Counts a play that missed the cache and starts caching the song once it is popular enough."""
+        name = self._name(key)
+        if name in self._entries or name in self._filling:
+            return
+        if len(self._plays) > 10000:
+            self._plays.clear()  # keeps the counter from growing forever, popular songs come back quickly
+        plays = self._plays.get(name, 0) + 1
+        self._plays[name] = plays
+        if plays >= self.min_plays:
+            self._filling.add(name)
+            asyncio.ensure_future(self._fill(name, url, codec))
+
+    async def _fill(self, name, url, codec):
+        path = os.path.join(self.directory, name)
+        tmp = path + ".tmp"
+        # Opus gets copied as is, anything else is encoded once here instead of on every play
+        audio = ["-c:a", "copy"] if codec == "opus" else ["-c:a", "libopus", "-b:a", "128k"]
+        try:
+            async with self._encoders:
+                process = await asyncio.create_subprocess_exec(
+                    "ffmpeg", "-nostdin", "-loglevel", "error", "-y", "-i", url, "-vn", *audio, "-f", "ogg", tmp,
+                )
+                if await process.wait() != 0:
+                    raise OSError(f"ffmpeg exited with {process.returncode}")
+            os.replace(tmp, path)
+            size = os.path.getsize(path)
+            self._plays.pop(name, None)
+            self._entries[name] = [size, 0]
+            self._size += size
+            self._evict()
+        except OSError as e:
+            print(f"Audio cache: failed to cache {name}: {e}")
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        finally:
+            self._filling.discard(name)
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            if self.policy == "lfu":
+                name = min(self._entries, key=lambda n: self._entries[n][1])
+            else:
+                name = next(iter(self._entries))
+            self._forget(name)
+
+    def _forget(self, name):
+        size, _ = self._entries.pop(name)
+        self._size -= size
+        try:
+            os.remove(os.path.join(self.directory, name))
+        except OSError:
+            pass  # still open for playback on Windows, it gets cleaned up on the next start
@@ -0,0 +1,87 @@
+import os
+import discord
+from audio_cache import AudioCache
+
+# The settings below are read when a song starts, not when this file is imported:
+# the launchers import it before load_dotenv() has put .env into the environment.
+
+
+def audio_mode():
+    """AUDIO_MODE: "opus" streams Opus packets straight to Discord when the source already
+    is Opus (YouTube webm audio usually is) and lets ffmpeg encode everything else.
+    "pcm" is the old FFmpegPCMAudio path where discord.py encodes every 20 ms frame itself.
+    """
+    return os.getenv("AUDIO_MODE", "opus")
+
+
+def normalize_enabled():
+    """AUDIO_NORMALIZE=1 brings every song to about the same loudness. Like !volume this
+    needs the decoded PCM (and numpy), so those songs skip the Opus passthrough, see pcm_gain.py.
+    """
+    return os.getenv("AUDIO_NORMALIZE", "").lower() in ("1", "true", "yes")
+
+
+# Optional on-disk cache of popular songs, turned on by setting AUDIO_CACHE_DIR
+audio_cache = None
+
+
+def get_audio_cache():
+    """The audio cache, made the first time it's asked for, or None when AUDIO_CACHE_DIR isn't set."""
+    global audio_cache
+    if audio_cache is None and os.getenv("AUDIO_CACHE_DIR"):
+        audio_cache = AudioCache(
+            os.getenv("AUDIO_CACHE_DIR"),
+            max_bytes=int(os.getenv("AUDIO_CACHE_MB", "2048")) * 1024 ** 2,
+            policy=os.getenv("AUDIO_CACHE_POLICY", "lru"),
+        )
+    return audio_cache
+
+
+async def probe_codec(info):
+    """Returns (codec, bitrate) for a resolved track, asking ffprobe only if yt-dlp didn't tell us."""
+    codec = info.get("acodec")
+    bitrate = info.get("abr")
+    if not codec or codec == "none":
+        codec, bitrate = await discord.FFmpegOpusAudio.probe(info["url"], method="fallback")
+    # discord only takes 8 - 512 kbps, fall back to its 128 default when unknown
+    bitrate = min(max(int(bitrate), 8), 512) if bitrate else 128
+    return codec, bitrate
+
+
+async def make_audio_source(info, ffmpeg_opts, mode=None, start_at=0, volume=None):
+    """Builds the audio source for a resolved track, optionally starting `start_at` seconds in.
+
+    `volume()` is the guild's volume; when it isn't 1.0 (or AUDIO_NORMALIZE is on)
+    the song is decoded to PCM and goes through a GainSource. `mode` defaults to AUDIO_MODE.
+    """
+    mode = mode or audio_mode()
+    normalize = normalize_enabled()
+    cache = get_audio_cache()
+    if start_at:
+        ffmpeg_opts = dict(ffmpeg_opts)
+        ffmpeg_opts["before_options"] = f"-ss {start_at:.1f} " + ffmpeg_opts.get("before_options", "")
+
+    if volume is not None and (normalize or volume() != 1.0):
+        from pcm_gain import GainSource, track_gains
+        key = info.get("webpage_url") or info["url"]
+        # started part way in, the first seconds aren't the song's start, so don't measure those
+        return GainSource(discord.FFmpegPCMAudio(info["url"], **ffmpeg_opts), volume,
+                          key=key, cache=None if start_at else track_gains, normalize=normalize)
+
+    if cache and not start_at:
+        # the stream URL changes every time, the page URL doesn't (local files only have a path)
+        key = info.get("webpage_url") or info["url"]
+        source = cache.open(key)
+        if source:
+            return source
+        cache.record_play(key, info["url"], info.get("acodec"))
+
+    if mode == "pcm":
+        return discord.FFmpegPCMAudio(info["url"], **ffmpeg_opts)
+
+    codec, bitrate = await probe_codec(info)
+    if codec == "opus":
+        # already Opus: ffmpeg only remuxes the packets, nothing gets decoded
+        return discord.FFmpegOpusAudio(info["url"], codec="copy", bitrate=bitrate, **ffmpeg_opts)
+    # anything else gets transcoded once, by ffmpeg, straight to Opus
+    return discord.FFmpegOpusAudio(info["url"], bitrate=bitrate, **ffmpeg_opts)
@@ -0,0 +1,75 @@
+# Compares CPU cost per voice stream of the PCM path (ffmpeg decodes, discord.py
+# Opus-encodes every frame) against the Opus passthrough path.
+#
+# usage: python bench_audio.py song.webm [seconds]
+# Use a local Opus/WebM file to see passthrough, any other format to see the transcode fallback.
+import sys
+import time
+import resource
+import asyncio
+import ctypes.util
+import discord
+from audio_source import make_audio_source
+
+FRAME_SECONDS = 0.02  # discord sends one 20 ms frame at a time
+
+
+def cpu_times():
+    """CPU seconds used so far by this process and by the ffmpeg children we already reaped."""
+    me = resource.getrusage(resource.RUSAGE_SELF)
+    kids = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return me.ru_utime + me.ru_stime, kids.ru_utime + kids.ru_stime
+
+
+def drain(source, max_frames):
+    """Pulls frames out of the source exactly like discord.py's player thread does, minus the sleeping."""
+    encoder = None if source.is_opus() else discord.opus.Encoder()
+    frames = 0
+    while frames < max_frames:
+        data = source.read()
+        if not data:
+            break
+        if encoder:
+            encoder.encode(data, encoder.SAMPLES_PER_FRAME)
+        frames += 1
+    source.cleanup()  # waits for ffmpeg so its CPU time shows up in RUSAGE_CHILDREN
+    return frames
+
+
+def run(path, mode, seconds):
+    info = {"url": path, "acodec": None, "abr": None}
+    source = asyncio.run(make_audio_source(info, {"options": "-vn"}, mode=mode))
+
+    start_self, start_kids = cpu_times()
+    start_wall = time.perf_counter()
+    frames = drain(source, int(seconds / FRAME_SECONDS))
+    wall = time.perf_counter() - start_wall
+    end_self, end_kids = cpu_times()
+
+    audio_seconds = frames * FRAME_SECONDS
+    python_cpu = end_self - start_self
+    ffmpeg_cpu = end_kids - start_kids
+    total = python_cpu + ffmpeg_cpu
+    print(f"{mode:>5}: {audio_seconds:6.1f}s of audio in {wall:5.2f}s | "
+          f"python {python_cpu:5.2f}s + ffmpeg {ffmpeg_cpu:5.2f}s CPU | "
+          f"{100 * total / audio_seconds:5.2f}% of a core per stream")
+
+
+def main():
+    if len(sys.argv) < 2:
+        sys.exit("usage: python bench_audio.py <local audio file> [seconds]")
+    path = sys.argv[1]
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 60
+
+    if not discord.opus.is_loaded():
+        lib = ctypes.util.find_library("opus")
+        if not lib:
+            sys.exit("❌ libopus not found, the PCM path needs it to encode frames")
+        discord.opus.load_opus(lib)
+
+    for mode in ("pcm", "opus"):
+        run(path, mode, seconds)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+# Frames per second one core can push through a volume stage, for the three ways of doing it:
+#   naive      scaling and clamping every sample in a Python loop
+#   audioop    discord.PCMVolumeTransformer (audioop.mul, one C call but a new bytes object per frame)
+#   numpy      pcm_gain.GainSource: volume + normalization on preallocated NumPy buffers
+#   numpy 1.5  the same turned up, which adds the clipping step
+#
+# Discord plays 50 frames a second per guild, so frames/s / 50 is how many guilds one core could serve
+# (just for the volume stage, the Opus encoding after it costs more).
+#
+# usage: python bench_gain.py [frames]
+import sys
+import time
+import array
+import random
+import discord
+from pcm_gain import GainSource, GainCache, SAMPLES_PER_FRAME
+
+
+class FakePCM(discord.AudioSource):
+    """Hands out the same few pre-made frames forever, so only the volume stage gets measured."""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self.position = 0
+
+    def read(self):
+        self.position += 1
+        return self.frames[self.position % len(self.frames)]
+
+
+class NaiveVolume(discord.AudioSource):
+    def __init__(self, source, volume):
+        self.source = source
+        self.volume = volume
+
+    def read(self):
+        samples = array.array("h", self.source.read())
+        for i, sample in enumerate(samples):
+            samples[i] = min(max(int(sample * self.volume), -32768), 32767)
+        return samples.tobytes()
+
+
+def make_frames(count=50):
+    random.seed(1)
+    frames = []
+    for _ in range(count):
+        samples = array.array("h", (int(random.gauss(0, 4000)) for _ in range(SAMPLES_PER_FRAME)))
+        frames.append(samples.tobytes())
+    return frames
+
+
+def measure(name, source, frames):
+    source.read()  # warm up
+    start = time.process_time()
+    for _ in range(frames):
+        source.read()
+    seconds = time.process_time() - start
+    rate = frames / seconds
+    print(f"{name:>8}: {rate:10.0f} frames/s per core | {seconds / frames * 1e6:7.1f} us/frame | "
+          f"~{rate / 50:6.0f} streams per core")
+    return rate
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    pcm = make_frames()
+    print(f"{frames} frames of 20 ms stereo s16le, volume 0.8")
+    naive = measure("naive", NaiveVolume(FakePCM(pcm), 0.8), max(frames // 20, 100))
+    audioop = measure("audioop", discord.PCMVolumeTransformer(FakePCM(pcm), 0.8), frames)
+    numpy = measure("numpy", GainSource(FakePCM(pcm), lambda: 0.8, key="song", cache=GainCache()), frames)
+    measure("numpy 1.5", GainSource(FakePCM(pcm), lambda: 1.5, normalize=False), frames)  # louder also clips
+    print(f"numpy vs naive: {numpy / naive:.0f}x, numpy vs audioop: {numpy / audioop:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
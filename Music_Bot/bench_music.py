@@ -0,0 +1,293 @@
+# Offline benchmark for the music commands (cogs/music.py, what skip.py runs).
+#
+# Drives the real play / queue / play_next / skip commands against fake voice clients,
+# fake contexts and a stub extractor, so no Discord connection, YouTube or
+# ffmpeg is needed. Reports time to first audio, the gap between songs,
+# extractions per minute, messages sent or edited and event-loop lag.
+#
+# Every guild starts with !play and queues the rest of its songs with !queue.
+#
+# usage: python bench_music.py --guilds 1 10 100 1000 --songs 4 --latency 0.3
+import os
+import sys
+import time
+import random
+import asyncio
+import argparse
+import tempfile
+
+# the music cog opens its queue database when it is created, keep the benchmark's away from the real one
+os.environ["MUSIC_DB"] = os.path.join(tempfile.mkdtemp(prefix="music_bench_"), "bench.db")
+os.environ.pop("AUDIO_CACHE_DIR", None)
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+import discord  # noqa: E402
+from cogs import Bot  # noqa: E402
+from cogs.music import Music  # noqa: E402  (needs the environment above)
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class Stats:
+    def __init__(self):
+        self.first_audio = []  # seconds from the first !play to the first vc.play, per guild
+        self.gaps = []  # seconds from a song ending to the next one starting
+        self.extractions = 0
+        self.messages = 0
+        self.loop_lag = []
+        self.play_errors = 0  # vc.play while a song was playing, on a real bot that's a ClientException
+
+
+class StubExtractor:
+    """Stands in for TrackExtractor: waits `latency` (+ jitter) seconds and makes up a track."""
+
+    def __init__(self, stats, latency, jitter=0.0):
+        self.stats = stats
+        self.latency = latency
+        self.jitter = jitter
+
+    async def resolve(self, query, guild_id=None):
+        self.stats.extractions += 1
+        await asyncio.sleep(self.latency + random.uniform(0, self.jitter))
+        return {"title": query, "url": f"stub://{query}", "duration": 1, "webpage_url": None, "acodec": "opus", "abr": 128}
+
+    async def iter_playlist(self, url, guild_id=None, page_size=50, limit=1000):
+        for i in range(min(limit, 20)):
+            yield {"url": f"{url}#{i}", "title": f"{url} #{i}", "duration": 1}
+
+
+class FakeSource:
+    def __init__(self, info):
+        self.info = info
+
+    def cleanup(self):
+        pass
+
+
+BOT_USER = type("User", (), {"id": 1, "bot": True})()
+LISTENER = type("Member", (), {"id": 2, "bot": False})()
+
+
+class FakeVoiceClient:
+    """Plays every song for `song_seconds` and then calls `after`, like discord.py's player thread."""
+
+    def __init__(self, channel, stats, song_seconds):
+        self.guild = channel.guild
+        self.channel = channel
+        self.user = BOT_USER
+        self.stats = stats
+        self.song_seconds = song_seconds
+        self._after = None
+        self._timer = None
+        self._ended_at = None
+
+    def play(self, source, *, after=None):
+        if self._timer:
+            self.stats.play_errors += 1
+            raise RuntimeError("Already playing audio.")
+        now = time.perf_counter()
+        if self.guild.first_queued_at is not None:
+            self.stats.first_audio.append(now - self.guild.first_queued_at)
+            self.guild.first_queued_at = None
+        if self._ended_at is not None:
+            self.stats.gaps.append(now - self._ended_at)
+            self._ended_at = None
+        self._after = after
+        self._timer = asyncio.get_running_loop().call_later(self.song_seconds, self._finish, None)
+
+    def _finish(self, error):
+        self._timer = None
+        self._ended_at = time.perf_counter()
+        after, self._after = self._after, None
+        if after:
+            after(error)
+
+    def is_playing(self):
+        return self._timer is not None
+
+    def is_connected(self):
+        return self.guild.voice_client is self
+
+    def is_paused(self):
+        return False
+
+    def stop(self):
+        if self._timer:
+            self._timer.cancel()
+            self._finish(None)
+
+    async def disconnect(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self.guild.voice_client = None
+        self.guild.done.set()
+
+
+class FakeChannel:
+    def __init__(self, guild):
+        self.guild = guild
+        self.members = [LISTENER]
+
+    async def connect(self):
+        self.guild.voice_client = FakeVoiceClient(self, self.guild.stats, self.guild.song_seconds)
+        return self.guild.voice_client
+
+
+class FakeGuild:
+    def __init__(self, guild_id, stats, song_seconds):
+        self.id = guild_id
+        self.stats = stats
+        self.song_seconds = song_seconds
+        self.voice_client = None
+        self.first_queued_at = None
+        self.done = asyncio.Event()
+
+
+class FakeMessage:
+    def __init__(self, stats, message_id):
+        self.stats = stats
+        self.id = message_id
+
+    async def edit(self, **kwargs):
+        self.stats.messages += 1
+
+
+class FakeTextChannel:
+    """Counts every send and edit, each one is a REST call on a real bot."""
+
+    def __init__(self, guild):
+        self.id = guild.id
+        self.stats = guild.stats
+        self.last_message_id = None
+
+    async def send(self, *args, **kwargs):
+        self.stats.messages += 1
+        self.last_message_id = (self.last_message_id or 0) + 1
+        return FakeMessage(self.stats, self.last_message_id)
+
+
+class FakeAuthor:
+    def __init__(self, guild):
+        self.voice = type("VoiceState", (), {"channel": FakeChannel(guild)})()
+        self.mention = "@bench"
+
+
+class FakeContext:
+    def __init__(self, guild):
+        self.guild = guild
+        self.author = FakeAuthor(guild)
+        self.channel = FakeTextChannel(guild)
+
+    @property
+    def voice_client(self):
+        return self.guild.voice_client
+
+    async def send(self, *args, **kwargs):
+        return await self.channel.send(*args, **kwargs)
+
+
+async def sample_loop_lag(stats, interval=0.01):
+    """Measures how late the event loop wakes us up, a stalled loop shows up here first."""
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        stats.loop_lag.append(time.perf_counter() - start - interval)
+
+
+async def run_guild(music, guild, songs, skip_every, play_every):
+    ctx = FakeContext(guild)
+    guild.first_queued_at = time.perf_counter()
+    for i in range(songs):
+        ctx.channel.last_message_id = (ctx.channel.last_message_id or 0) + 1  # the user's !play / !queue message
+        if i == 0:
+            await music.play(ctx, query=f"guild {guild.id} song {i}")
+        else:
+            await music.queue(ctx, query=f"guild {guild.id} song {i}")
+    replaced = 0
+    if skip_every or play_every:
+        every = min(x for x in (skip_every, play_every) if x)
+        while not guild.done.is_set():
+            await asyncio.sleep(guild.song_seconds * every)
+            if not (guild.voice_client and guild.voice_client.is_playing()):
+                continue
+            if play_every and replaced < songs:
+                # !play while something plays replaces that song, the queue stays as it is
+                replaced += 1
+                ctx.channel.last_message_id += 1
+                await music.play(ctx, query=f"guild {guild.id} replacement {replaced}")
+            elif skip_every:
+                await music.skip(ctx)
+    await guild.done.wait()
+
+
+async def _fake_make_source(info, start_at=0, guild_id=None):
+    return FakeSource(info)
+
+
+async def run(first_guild_id, guilds, songs, latency, jitter, song_seconds, skip_every, play_every):
+    stats = Stats()
+    stub = StubExtractor(stats, latency, jitter)
+    bot = Bot(command_prefix="!", intents=discord.Intents.none())
+    bot.loop = asyncio.get_running_loop()  # normally set by bot.run()
+    music = Music(bot)
+    music.extractor = stub
+    music.prefetcher.extractor = stub
+    music.prefetcher.make_source = music.make_source = _fake_make_source
+    music.voice.idle_timeout = 0  # leave as soon as the queue is done, that's when a guild counts as finished
+    await bot.add_cog(music)
+
+    lag_task = asyncio.ensure_future(sample_loop_lag(stats))
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        run_guild(music, FakeGuild(first_guild_id + i, stats, song_seconds), songs, skip_every, play_every)
+        for i in range(guilds)
+    ))
+    wall = time.perf_counter() - start
+    lag_task.cancel()
+    await asyncio.sleep(music.status.max_delay + music.status.delay)  # let the last status messages go out
+    await bot.remove_cog("Music")
+    return stats, wall
+
+
+def report(guilds, stats, wall):
+    ms = 1000
+    print(f"{guilds:>6} | "
+          f"TTFA p50 {percentile(stats.first_audio, 50) * ms:7.1f} p99 {percentile(stats.first_audio, 99) * ms:7.1f} ms | "
+          f"gap p50 {percentile(stats.gaps, 50) * ms:6.1f} p99 {percentile(stats.gaps, 99) * ms:6.1f} ms | "
+          f"{stats.extractions / wall * 60:8.0f} extr/min | "
+          f"{stats.messages / guilds:5.1f} msgs/guild | "
+          f"loop lag p99 {percentile(stats.loop_lag, 99) * ms:6.1f} max {max(stats.loop_lag, default=0) * ms:6.1f} ms")
+    if stats.play_errors:
+        print(f"       ! {stats.play_errors} times a song was started while another one was playing")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline benchmark for the music commands")
+    parser.add_argument("--guilds", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--songs", type=int, default=4, help="songs queued per guild")
+    parser.add_argument("--latency", type=float, default=0.3, help="stub extraction time in seconds")
+    parser.add_argument("--jitter", type=float, default=0.1)
+    parser.add_argument("--song-seconds", type=float, default=1.0, help="how long each fake song plays")
+    parser.add_argument("--skip-every", type=float, default=0, help="skip after this many song lengths, 0 = never")
+    parser.add_argument("--play-every", type=float, default=0,
+                        help="!play another song over the current one after this many song lengths, 0 = never")
+    args = parser.parse_args()
+
+    print(" guilds | time to first audio | song transition gap | extractions | messages | event loop")
+    first_guild_id = 1
+    for guilds in args.guilds:
+        # fresh guild ids every round so nothing gets restored from the round before
+        stats, wall = asyncio.run(run(first_guild_id, guilds, args.songs, args.latency, args.jitter,
+                                      args.song_seconds, args.skip_every, args.play_every))
+        report(guilds, stats, wall)
+        first_guild_id += guilds
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,322 @@
+import os
+import time
+import asyncio
+import threading
+import multiprocessing
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from urllib.parse import urlparse, parse_qs
+
+
+def normalize_query(query):
+    """Turns a query/URL into the key we cache it under."""
+    query = query.strip()
+    if query.startswith(("http://", "https://")):
+        return query
+    # "Never Gonna  Give you up" and "never gonna give you up" are the same search
+    return " ".join(query.casefold().split())
+
+
+def url_expiry(stream_url):
+    """Returns the unix time a signed stream URL stops working, or None if it isn't signed."""
+    try:
+        expire = parse_qs(urlparse(stream_url).query).get("expire")
+        return int(expire[0]) if expire else None
+    except (ValueError, TypeError):
+        return None
+
+
+class TrackCache:
+    """Small LRU cache of resolved tracks where every entry also has its own expiry time."""
+
+    def __init__(self, max_size=512, ttl=60 * 60, safety_margin=5 * 60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.safety_margin = safety_margin  # drop entries this long before the stream URL dies
+        self._entries = OrderedDict()  # key -> (expires_at, info)
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, info = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)  # mark as recently used
+        self.hits += 1
+        return info
+
+    def put(self, key, info):
+        now = time.time()
+        expires_at = now + self.ttl
+        signed_until = url_expiry(info.get("url", ""))
+        if signed_until:
+            expires_at = min(expires_at, signed_until - self.safety_margin)
+        if expires_at <= now:
+            return  # already too close to expiring, not worth keeping
+
+        self._entries[key] = (expires_at, info)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)  # evict the least recently used
+
+    def __len__(self):
+        return len(self._entries)
+
+
+# --- Worker process side ---
+# Every worker process builds one YoutubeDL when it starts and keeps it for its whole life.
+_worker_ydl = None
+_worker_flat_ydl = None
+
+
+def _init_worker(ytdlp_opts):
+    global _worker_ydl, _worker_flat_ydl
+    # yt-dlp is big, only the worker processes load it, the bot process never does
+    import yt_dlp
+    _worker_ydl = yt_dlp.YoutubeDL(ytdlp_opts)
+    # playlists are only listed (ids, titles, durations), nothing gets resolved to a stream
+    _worker_flat_ydl = yt_dlp.YoutubeDL({**ytdlp_opts, 'noplaylist': False, 'extract_flat': 'in_playlist'})
+
+
+def _extract_in_worker(query):
+    info = _worker_ydl.extract_info(query, download=False)
+    if "entries" in info:
+        # Handle search result or playlist entry
+        info = info["entries"][0]
+    return slim_info(info)  # keep what travels back between processes small
+
+
+def _extract_playlist_page(url, start, count):
+    # only asks the site for entries start .. start+count-1 instead of the whole playlist
+    _worker_flat_ydl.params['playlist_items'] = f"{start}-{start + count - 1}"
+    info = _worker_flat_ydl.extract_info(url, download=False)
+    # deleted or private videos come back as None or without a url; they stay in
+    # the list as None so its length still tells whether this was the last page
+    return [
+        {"url": entry.get("url") or entry.get("webpage_url"), "title": entry.get("title"), "duration": entry.get("duration")}
+        if entry and (entry.get("url") or entry.get("webpage_url")) else None
+        for entry in info.get("entries") or []
+    ]
+
+
+class _Job:
+    __slots__ = ("call", "key", "guild_id", "future", "waiters", "started")
+
+    def __init__(self, call, key, guild_id, future):
+        self.call = call  # (function, *args) to run in a worker
+        self.key = key
+        self.guild_id = guild_id
+        self.future = future
+        self.waiters = 0
+        self.started = None  # when a worker picked it up
+
+
+class TrackExtractor:
+    """Resolves songs with yt-dlp in a pool of worker processes and caches the results.
+
+    Extraction is CPU heavy, so it runs in separate processes where it can't fight
+    the event loop for the GIL. At most `workers` lookups run at once and waiting
+    lookups are handed out round-robin per guild, so one guild queueing twenty
+    songs can't keep everybody else waiting.
+    """
+
+    def __init__(self, ytdlp_opts, workers=None, cache_size=512, ttl=60 * 60):
+        self.ytdlp_opts = ytdlp_opts
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.cache = TrackCache(max_size=cache_size, ttl=ttl)
+        self._executor = None
+        self._jobs = {}  # key -> _Job, so two guilds asking for the same song share one lookup
+        self._pending = {}  # guild_id -> deque of jobs waiting for a worker
+        self._turns = deque()  # guilds with waiting jobs, in the order they get served
+        self._running = 0
+        self.observe = None  # optional function that gets every lookup's duration in seconds
+
+    @property
+    def running(self):
+        """Lookups a worker is busy with right now."""
+        return self._running
+
+    @property
+    def waiting(self):
+        """Lookups waiting for a free worker."""
+        return sum(len(jobs) for jobs in self._pending.values())
+
+    def start(self):
+        """Starts the worker processes.
+
+        Call this before bot.run(): on Linux the workers are forked, and forking
+        before the event loop and voice threads exist is the safe moment to do it.
+        If nobody did, the first lookup starts them.
+        """
+        if self._executor is not None:
+            return
+        # fork where we can, Windows only has spawn. Once the bot runs there are other
+        # threads, then forkserver forks from a clean helper process instead of from us.
+        methods = multiprocessing.get_all_start_methods()
+        if "fork" in methods and threading.active_count() == 1:
+            method = "fork"
+        elif "forkserver" in methods:
+            method = "forkserver"
+        else:
+            method = "spawn"
+        context = multiprocessing.get_context(method)
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(self.ytdlp_opts,),
+        )
+        self._executor.submit(int)  # makes the pool launch its processes right now
+
+    def _drop_pool(self, broken):
+        # a worker died (killed, out of memory, ...), which breaks the whole pool for good.
+        # The next lookup starts a new one.
+        if self._executor is not broken:
+            return  # another job already noticed
+        print("yt-dlp worker pool broke, starting a new one")
+        self._executor = None
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def _dispatch(self):
+        # hand waiting jobs to free workers, one guild at a time
+        loop = asyncio.get_running_loop()
+        while self._running < self.workers and self._turns:
+            guild_id = self._turns.popleft()
+            waiting = self._pending[guild_id]
+            job = waiting.popleft()
+            if waiting:
+                self._turns.append(guild_id)  # back of the line until everyone else had a turn
+            else:
+                del self._pending[guild_id]
+
+            if job.future.done():
+                continue  # nobody wants this one anymore
+
+            self._running += 1
+            job.started = time.perf_counter()
+            work = None
+            try:
+                work, executor = self._run(loop, job)
+            except Exception as e:  # the pool wouldn't take it, even a fresh one
+                self._forget(job)
+                if not job.future.done():
+                    job.future.set_exception(e)
+            finally:
+                if work is None:
+                    self._running -= 1  # give the slot back, nothing is running in it
+            if work is not None:
+                work.add_done_callback(
+                    lambda work, job=job, executor=executor: self._finished(job, work, executor))
+
+    def _run(self, loop, job):
+        self.start()
+        executor = self._executor
+        try:
+            return loop.run_in_executor(executor, *job.call), executor
+        except BrokenProcessPool:
+            # it broke after the last lookup finished, this job goes to a new pool
+            self._drop_pool(executor)
+            self.start()
+            return loop.run_in_executor(self._executor, *job.call), self._executor
+
+    def _forget(self, job):
+        if job.key is not None and self._jobs.get(job.key) is job:
+            del self._jobs[job.key]
+
+    def _finished(self, job, work, executor):
+        self._running -= 1
+        if self.observe:
+            self.observe(time.perf_counter() - job.started)
+        self._forget(job)
+
+        if not work.cancelled() and isinstance(work.exception(), BrokenProcessPool):
+            self._drop_pool(executor)  # this job fails, the ones after it get a new pool
+
+        if work.cancelled():
+            job.future.cancel()
+        elif work.exception() is not None:
+            if not job.future.done():
+                job.future.set_exception(work.exception())
+        else:
+            # cache it even if the requester gave up, somebody will probably ask again
+            info = work.result()
+            if job.key is not None:
+                self.cache.put(job.key, info)
+            if not job.future.done():
+                job.future.set_result(info)
+        self._dispatch()
+
+    def _submit(self, call, key, guild_id):
+        self.start()
+        job = _Job(call, key, guild_id, asyncio.get_running_loop().create_future())
+        if key is not None:
+            self._jobs[key] = job
+        if guild_id not in self._pending:
+            self._pending[guild_id] = deque()
+            self._turns.append(guild_id)
+        self._pending[guild_id].append(job)
+        self._dispatch()
+        return job
+
+    async def resolve(self, query, guild_id=None):
+        """Returns the info dict (title, url, ...) for a query, from cache when we can."""
+        key = normalize_query(query)
+        info = self.cache.get(key)
+        if info is not None:
+            return info
+
+        job = self._jobs.get(key) or self._submit((_extract_in_worker, query), key, guild_id)
+        return await self._wait(job)
+
+    async def iter_playlist(self, url, guild_id=None, page_size=50, limit=1000):
+        """Yields a playlist's entries ({url, title, duration}) a page at a time.
+
+        Only the listing is fetched, nothing is resolved to a stream, and only one
+        page is held in memory, so the first entry arrives just as fast for a
+        20 song playlist as for a 2000 song one. Entries without a url are skipped.
+        """
+        start = 1
+        while start <= limit:
+            count = min(page_size, limit - start + 1)
+            page = await self._wait(self._submit((_extract_playlist_page, url, start, count), None, guild_id))
+            for entry in page:
+                if entry:
+                    yield entry
+            if len(page) < count:
+                return  # that was the last page
+            start += count
+
+    async def _wait(self, job):
+        # Cancelling the waiting task (e.g. after a skip or stop) drops the job
+        # if it hasn't reached a worker yet and nobody else is waiting on it.
+        job.waiters += 1
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            if not job.future.done() and job.waiters == 1:
+                job.future.cancel()
+                self._forget(job)
+            raise
+        finally:
+            job.waiters -= 1
+
+
+def slim_info(info):
+    """Keeps only the fields we actually use, the full yt-dlp dict is huge."""
+    return {
+        "title": info.get("title"),
+        "url": info["url"],
+        "duration": info.get("duration"),
+        "webpage_url": info.get("webpage_url"),
+        "acodec": info.get("acodec"),
+        "abr": info.get("abr"),
+    }
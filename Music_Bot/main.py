@@ -1,18 +1,15 @@
 import os
 import logging
 from dotenv import load_dotenv
-import asyncio
-import yt_dlp
 import discord
 from discord.ext import commands
+from extractor import TrackExtractor
+from audio_source import make_audio_source
 
 # 1. Load environment variables
 load_dotenv()
 token = os.getenv('DISCORD_TOKEN')
 
-handler = logging.FileHandler(filename='discord.log', encoding='utf-8', mode='w')
-discord.utils.setup_logging(handler=handler, root=True, level=logging.INFO)
-
 # 2. Configure Intents
 intents = discord.Intents.default()
 intents.message_content = True
@@ -22,7 +19,7 @@ bot = commands.Bot(command_prefix='!', intents=intents)
 
 # YTDLP SETTINGS
 ytdlp_opts = {
-    'format': 'bestaudio/best',
+    'format': 'bestaudio[acodec=opus]/bestaudio/best',  # prefer Opus so it can be passed straight through
     'noplaylist': True,
     'quiet': True,  # Corrected typo from 'quite' to 'quiet'
     'default_search': 'ytsearch',
@@ -41,6 +38,9 @@ ffmpeg_opts = {
     # -vn tells it to drop video stream. The other format options are implicitly handled by discord.py's FFmpegPCMAudio
 }
 
+# One long-lived extractor for the whole bot instead of a new YoutubeDL per song
+extractor = TrackExtractor(ytdlp_opts)
+
 
 @bot.event
 async def on_ready():
@@ -80,26 +80,21 @@ async def play(ctx, *, query):
 
     try:
         # 1. Extract Information
-        # Use asyncio.to_thread for blocking operation (yt-dlp)
-        info = await asyncio.to_thread(yt_dlp.YoutubeDL(ytdlp_opts).extract_info, query, download=False)
+        # Pooled yt-dlp lookup, repeat requests come straight from the cache
+        info = await extractor.resolve(query, ctx.guild.id)
 
-        if "entries" in info:
-            # Handle search result or playlist entry
-            info = info["entries"][0]
-
-        # 2. Get the stream URL
-        # yt-dlp guarantees 'url' is present if 'format': 'bestaudio/best' is used
-        stream_url = info['url']
+        # 2. Get the title (make_audio_source reads the stream URL from info itself)
         title = info["title"]
 
+        # 3. Create the audio source (ffprobe and ffmpeg can fail too, e.g. on an expired URL)
+        source = await make_audio_source(info, ffmpeg_opts)
+
     except Exception as e:
         print(f"yt-dlp error: {e}")
         # Log the error for debugging, send a friendly message to the user
         return await ctx.send(f"❌ Failed to load audio for **{query}**. The source may be unavailable or private.")
 
-    # 3. Create the audio source and play
-    source = discord.FFmpegPCMAudio(stream_url, **ffmpeg_opts)
-
+    # 4. Play
     if vc.is_playing():
         vc.stop()
 
@@ -142,17 +137,23 @@ async def stop(ctx):
         await ctx.send("❌ Not connected to a voice channel.")
 
 
-# --- Opus Library Check (Enhanced) ---
-if not discord.opus.is_loaded():
-    try:
-        # Change "libopus.dll" to the correct filename for your OS (e.g., 'libopus.so' on Linux)
-        discord.opus.load_opus("libopus.dll")
-        print("Opus library loaded successfully.")
-    except Exception as e:
-        # Crucial for troubleshooting: informs the developer if the Opus file is missing
-        print(f"❌ ERROR: Failed to load Opus library: {e}")
-        print("Please ensure 'libopus.dll' (or the correct version for your OS) is in the bot's working directory.")
-
 # Run the Bot
 if __name__ == "__main__":
+    # Only when started as a script. The yt-dlp workers can import this file again
+    # (spawn/forkserver), and they mustn't empty discord.log or look for Opus.
+    handler = logging.FileHandler(filename='discord.log', encoding='utf-8', mode='w')
+    discord.utils.setup_logging(handler=handler, root=True, level=logging.INFO)
+
+    # --- Opus Library Check (Enhanced) ---
+    if not discord.opus.is_loaded():
+        try:
+            # Change "libopus.dll" to the correct filename for your OS (e.g., 'libopus.so' on Linux)
+            discord.opus.load_opus("libopus.dll")
+            print("Opus library loaded successfully.")
+        except Exception as e:
+            # Crucial for troubleshooting: informs the developer if the Opus file is missing
+            print(f"❌ ERROR: Failed to load Opus library: {e}")
+            print("Please ensure 'libopus.dll' (or the correct version for your OS) is in the bot's working directory.")
+
+    extractor.start()  # start the yt-dlp worker processes before the event loop exists
     bot.run(token)
@@ -0,0 +1,122 @@
+import math
+from collections import OrderedDict
+import numpy as np
+import discord
+
+SAMPLES_PER_FRAME = 960 * 2  # 20 ms of 48 kHz stereo, what FFmpegPCMAudio hands out per read()
+ANALYSE_FRAMES = 250  # the first 5 s of a song decide its normalization gain
+TARGET_DB = -20.0  # loudness every song is brought to, in dB below full scale (RMS)
+MAX_STEP = 0.05  # gain changes at most this much per frame, so volume changes don't click
+NORMALIZE_DB_PER_SECOND = 3.0  # a freshly measured normalization gain fades in this fast
+NORMALIZE_STEP = 10 ** (NORMALIZE_DB_PER_SECOND / 20 / 50)  # the same per 20 ms frame, as a factor
+
+
+class GainCache:
+    """Normalization gain per song, so a song is only analysed the first time it plays."""
+
+    def __init__(self, max_size=5000):
+        self.max_size = max_size
+        self._gains = OrderedDict()  # song key -> gain
+
+    def get(self, key):
+        gain = self._gains.get(key)
+        if gain is not None:
+            self._gains.move_to_end(key)
+        return gain
+
+    def put(self, key, gain):
+        self._gains[key] = gain
+        self._gains.move_to_end(key)
+        if len(self._gains) > self.max_size:
+            self._gains.popitem(last=False)
+
+    def __len__(self):
+        return len(self._gains)
+
+
+# measured gains of the songs played lately, shared by every guild
+track_gains = GainCache()
+
+
+def normalization_gain(sum_squares, samples, target_db=TARGET_DB):
+    """Gain that brings audio with this energy to `target_db`, kept between 1/4 and 4x."""
+    if not samples or not sum_squares:
+        return 1.0
+    rms = math.sqrt(sum_squares / samples) / 32768
+    return min(max(10 ** (target_db / 20) / rms, 0.25), 4.0)
+
+
+class GainSource(discord.AudioSource):
+    """Wraps a PCM source (20 ms s16le frames) and applies the guild's volume and the song's normalization gain.
+
+    `volume()` returns the guild's volume (1.0 = as is) and is asked every
+    frame, so !volume changes the song that is already playing.
+
+    All the math is done by NumPy on buffers made once per source, so a frame
+    costs a few vectorized calls and no new arrays. With `key` and `cache` the
+    song's gain is measured over its first ANALYSE_FRAMES frames, faded in at
+    NORMALIZE_DB_PER_SECOND and saved; the next time it plays it starts at
+    that gain straight away.
+    """
+
+    def __init__(self, source, volume, key=None, cache=None, normalize=True):
+        self.source = source
+        self.volume = volume
+        self.key = key
+        self.cache = cache
+        self.track_gain = 1.0
+        self._analysed = 0 if normalize else ANALYSE_FRAMES
+        self._sum_squares = 0.0
+        self._samples = 0
+        cached = cache.get(key) if normalize and cache is not None and key else None
+        if cached is not None:
+            self.track_gain = cached
+            self._analysed = ANALYSE_FRAMES  # already known, nothing to measure
+        self._track_gain = self.track_gain  # the normalization gain applied right now, fading towards track_gain
+        self._gain = self.volume() * self.track_gain
+        self._scaled = np.empty(SAMPLES_PER_FRAME, dtype=np.float32)
+        self._out = np.empty(SAMPLES_PER_FRAME, dtype=np.int16)
+
+    def is_opus(self):
+        return False
+
+    def read(self):
+        data = self.source.read()
+        if len(data) != SAMPLES_PER_FRAME * 2:
+            return data  # b"" at the end, or an odd last frame discord.py is about to drop anyway
+        samples = np.frombuffer(data, dtype=np.int16)  # a view, no copy
+        scaled = self._scaled
+
+        if self._analysed < ANALYSE_FRAMES:
+            np.copyto(scaled, samples)
+            self._sum_squares += float(np.dot(scaled, scaled))
+            self._samples += SAMPLES_PER_FRAME
+            self._analysed += 1
+            if self._analysed == ANALYSE_FRAMES:
+                self.track_gain = normalization_gain(self._sum_squares, self._samples)
+                if self.cache is not None and self.key:
+                    self.cache.put(self.key, self.track_gain)
+
+        track_gain = self._track_gain
+        if track_gain != self.track_gain:
+            # a few dB per second, so the song doesn't get louder or quieter all at once after 5 s
+            if track_gain < self.track_gain:
+                track_gain = min(track_gain * NORMALIZE_STEP, self.track_gain)
+            else:
+                track_gain = max(track_gain / NORMALIZE_STEP, self.track_gain)
+            self._track_gain = track_gain
+
+        # move towards the wanted gain a little per frame instead of jumping
+        target = self.volume() * track_gain
+        self._gain += min(max(target - self._gain, -MAX_STEP), MAX_STEP)
+        if self._gain == 1.0:
+            return data
+
+        np.multiply(samples, self._gain, out=scaled)
+        if self._gain > 1.0:
+            np.clip(scaled, -32768, 32767, out=scaled)  # only louder can go past the int16 range
+        np.copyto(self._out, scaled, casting="unsafe")
+        return self._out.tobytes()
+
+    def cleanup(self):
+        self.source.cleanup()
@@ -0,0 +1,58 @@
+import asyncio
+
+
+class Prefetcher:
+    """Gets the next queued song ready while the current one is still playing.
+
+    For each guild we keep one background task that resolves the head of the
+    queue and builds its audio source, so when the song ends play_next only has
+    to hand the ready source to the voice client.
+    """
+
+    def __init__(self, extractor, make_source):
+        self.extractor = extractor
+        self.make_source = make_source
+        self._jobs = {}  # guild_id -> (query, task)
+
+    async def _prepare(self, guild_id, query):
+        info = await self.extractor.resolve(query, guild_id)
+        return info, await self.make_source(info, guild_id=guild_id)
+
+    def schedule(self, guild_id, query):
+        """Starts preparing `query` for this guild, replacing whatever was being prepared before."""
+        job = self._jobs.get(guild_id)
+        if job and job[0] == query:
+            return  # already on it
+        self.cancel(guild_id)
+        self._jobs[guild_id] = (query, asyncio.ensure_future(self._prepare(guild_id, query)))
+
+    def is_ready(self, guild_id, query):
+        """True if `query` is already prepared and can start playing immediately."""
+        job = self._jobs.get(guild_id)
+        return bool(job) and job[0] == query and job[1].done() and not job[1].cancelled() \
+            and job[1].exception() is None
+
+    def cancel(self, guild_id):
+        """Throws away the prepared song, e.g. after the queue changed or the bot stopped."""
+        job = self._jobs.pop(guild_id, None)
+        if not job:
+            return
+        task = job[1]
+        if not task.done():
+            task.cancel()
+        elif not task.cancelled() and task.exception() is None:
+            # ffmpeg was already started for it, kill that process
+            task.result()[1].cleanup()
+
+    async def take(self, guild_id, query):
+        """Returns (info, source) for `query`, using the prepared one if it matches."""
+        job = self._jobs.pop(guild_id, None)
+        if job and job[0] == query:
+            try:
+                return await job[1]
+            except Exception as e:
+                print(f"Prefetch failed for {query}: {e}")
+        elif job:
+            self._jobs[guild_id] = job
+            self.cancel(guild_id)
+        return await self._prepare(guild_id, query)
@@ -2,18 +2,17 @@ import os
 import logging
 from dotenv import load_dotenv
 import asyncio
-import yt_dlp
 import discord
 from discord.ext import commands
+from extractor import TrackExtractor
+from audio_source import make_audio_source
 from collections import defaultdict
+from track_queue import Track, TrackQueue
 
 # 1. Load environment variables
 load_dotenv()
 token = os.getenv('DISCORD_TOKEN')
 
-handler = logging.FileHandler(filename='discord.log', encoding='utf-8', mode='w')
-discord.utils.setup_logging(handler=handler, root=True, level=logging.INFO)
-
 # 2. Configure Intents
 intents = discord.Intents.default()
 intents.message_content = True
@@ -21,11 +20,11 @@ intents.message_content = True
 # 3. Initialize Bot
 bot = commands.Bot(command_prefix='!', intents=intents)
 
-queue_dict=defaultdict(list)
+queue_dict = defaultdict(TrackQueue)
 
 # YTDLP SETTINGS
 ytdlp_opts = {
-    'format': 'bestaudio/best',
+    'format': 'bestaudio[acodec=opus]/bestaudio/best',  # prefer Opus so it can be passed straight through
     'noplaylist': True,
     'quiet': True,  # Corrected typo from 'quite' to 'quiet'
     'default_search': 'ytsearch',
@@ -44,6 +43,9 @@ ffmpeg_opts = {
     # -vn tells it to drop video stream. The other format options are implicitly handled by discord.py's FFmpegPCMAudio
 }
 
+# One long-lived extractor for the whole bot instead of a new YoutubeDL per song
+extractor = TrackExtractor(ytdlp_opts)
+
 
 @bot.event
 async def on_ready():
@@ -61,6 +63,8 @@ async def info(ctx):
         color=discord.Color.green()
     )
     embed.add_field(name="!play <song name or URL>", value="plays music from YouTube/Spotify", inline=False)
+    embed.add_field(name="!queue <song name or URL>", value="adds a song to the queue", inline=False)
+    embed.add_field(name="!showqueue [page]", value="shows the queue, 10 songs a page", inline=False)
     embed.add_field(name="!pause", value="pause the song.", inline=False)
     embed.add_field(name="!resume", value="resume the song.", inline=False)
     embed.add_field(name="!stop", value="stop and leave the voice channel", inline=False)
@@ -83,26 +87,21 @@ async def play(ctx, *, query):
 
     try:
         # 1. Extract Information
-        # Use asyncio.to_thread for blocking operation (yt-dlp)
-        info = await asyncio.to_thread(yt_dlp.YoutubeDL(ytdlp_opts).extract_info, query, download=False)
+        # Pooled yt-dlp lookup, repeat requests come straight from the cache
+        info = await extractor.resolve(query, ctx.guild.id)
 
-        if "entries" in info:
-            # Handle search result or playlist entry
-            info = info["entries"][0]
-
-        # 2. Get the stream URL
-        # yt-dlp guarantees 'url' is present if 'format': 'bestaudio/best' is used
-        stream_url = info['url']
+        # 2. Get the title (make_audio_source reads the stream URL from info itself)
         title = info["title"]
 
+        # 3. Create the audio source (ffprobe and ffmpeg can fail too, e.g. on an expired URL)
+        source = await make_audio_source(info, ffmpeg_opts)
+
     except Exception as e:
         print(f"yt-dlp error: {e}")
         # Log the error for debugging, send a friendly message to the user
         return await ctx.send(f"❌ Failed to load audio for **{query}**. The source may be unavailable or private.")
 
-    # 3. Create the audio source and play
-    source = discord.FFmpegPCMAudio(stream_url, **ffmpeg_opts)
-
+    # 4. Play
     if vc.is_playing():
         vc.stop()
 
@@ -121,26 +120,22 @@ async def play_next(ctx):
         await ctx.send("Queue completed👌")
         return  # No more songs
 
-    query = queue_dict[guild_id][0]
+    track = queue_dict[guild_id].popleft()
+    query = track.query
     vc = ctx.voice_client or ctx.author.voice.channel.connect()
 
     await ctx.send(f"⏳ Loading: **{query}**")
 
     try:
         # 1. Extract Information
-        # Use asyncio.to_thread for blocking operation (yt-dlp)
-        info = await asyncio.to_thread(yt_dlp.YoutubeDL(ytdlp_opts).extract_info, query, download=False)
-
-        if "entries" in info:
-            # Handle search result or playlist entry
-            info = info["entries"][0]
+        # Pooled yt-dlp lookup, repeat requests come straight from the cache
+        info = await extractor.resolve(query, ctx.guild.id)
 
-        # 2. Get the stream URL
-        # yt-dlp guarantees 'url' is present if 'format': 'bestaudio/best' is used
-        stream_url = info['url']
+        # 2. Get the title (make_audio_source reads the stream URL from info itself)
         title = info["title"]
+        track.update(info)
 
-        source =  discord.FFmpegPCMAudio(stream_url, **ffmpeg_opts)
+        source = await make_audio_source(info, ffmpeg_opts)
 
     except Exception as e:
         print(f"yt-dlp error: {e}")
@@ -159,20 +154,22 @@ async def play_next(ctx):
 async def queue(ctx, *, query):
     guild_id = ctx.guild.id
     vc = ctx.voice_client
-    queue_dict[guild_id].append(query)
+    position = queue_dict[guild_id].append(Track(query))
 
     # Add song to queue (store only the query, extraction happens later)
-    await ctx.send(f"📌 Added to queue: **{query}**")
-
-    # Display queue
-    q_list = "\n".join([f"{i + 1}. {q}" for i, q in enumerate(queue_dict[guild_id])])
-    await ctx.send(f"🎶 Current Queue:\n{q_list}")
+    await ctx.send(f"📌 Added to queue: **{query}** (#{position}). See it all with `!showqueue`")
 
     # If nothing is playing, start playing the first song
     if not vc or not vc.is_playing():
         await play_next(ctx)
 
 
+@bot.command()
+async def showqueue(ctx, page: int = 1):
+    """Shows one page of the queue."""
+    await ctx.send(queue_dict[ctx.guild.id].render_page(page))
+
+
 # --- Control Commands ---
 @bot.command()
 async def pause(ctx):
@@ -207,17 +204,23 @@ async def stop(ctx):
         await ctx.send("❌ Not connected to a voice channel.")
 
 
-# --- Opus Library Check (Enhanced) ---
-if not discord.opus.is_loaded():
-    try:
-        # Change "libopus.dll" to the correct filename for your OS (e.g., 'libopus.so' on Linux)
-        discord.opus.load_opus("libopus.dll")
-        print("Opus library loaded successfully.")
-    except Exception as e:
-        # Crucial for troubleshooting: informs the developer if the Opus file is missing
-        print(f"❌ ERROR: Failed to load Opus library: {e}")
-        print("Please ensure 'libopus.dll' (or the correct version for your OS) is in the bot's working directory.")
-
 # Run the Bot
 if __name__ == "__main__":
+    # Only when started as a script. The yt-dlp workers can import this file again
+    # (spawn/forkserver), and they mustn't empty discord.log or look for Opus.
+    handler = logging.FileHandler(filename='discord.log', encoding='utf-8', mode='w')
+    discord.utils.setup_logging(handler=handler, root=True, level=logging.INFO)
+
+    # --- Opus Library Check (Enhanced) ---
+    if not discord.opus.is_loaded():
+        try:
+            # Change "libopus.dll" to the correct filename for your OS (e.g., 'libopus.so' on Linux)
+            discord.opus.load_opus("libopus.dll")
+            print("Opus library loaded successfully.")
+        except Exception as e:
+            # Crucial for troubleshooting: informs the developer if the Opus file is missing
+            print(f"❌ ERROR: Failed to load Opus library: {e}")
+            print("Please ensure 'libopus.dll' (or the correct version for your OS) is in the bot's working directory.")
+
+    extractor.start()  # start the yt-dlp worker processes before the event loop exists
     bot.run(token)
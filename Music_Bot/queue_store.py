@@ -0,0 +1,87 @@
+import time
+from sqlite_store import open_db, PeriodicFlush
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS queued_tracks (
+    guild_id INTEGER NOT NULL,
+    position INTEGER NOT NULL,
+    query TEXT NOT NULL,
+    title TEXT,
+    duration INTEGER,
+    PRIMARY KEY (guild_id, position)
+);
+CREATE TABLE IF NOT EXISTS now_playing (
+    guild_id INTEGER PRIMARY KEY,
+    query TEXT NOT NULL,
+    title TEXT,
+    duration INTEGER,
+    elapsed REAL NOT NULL,
+    saved_at REAL NOT NULL
+);
+"""
+
+
+class QueueStore(PeriodicFlush):
+    """Saves every guild's queue and now-playing song to SQLite so a restart doesn't lose them.
+
+    Changes are not written right away: guilds are only marked dirty and a
+    background task writes all of them in one transaction every `flush_interval`
+    seconds. `snapshot(guild_id)` is asked for the current state at write time and
+    must return (tracks, now_playing_track_or_None, elapsed_seconds).
+    """
+
+    what = "music queues"
+
+    def __init__(self, snapshot, path="music_state.db", flush_interval=2.0, position_interval=10.0):
+        super().__init__(open_db(path, SCHEMA, check_same_thread=False), flush_interval)
+        self.snapshot = snapshot
+        self.position_interval = position_interval  # how often playback positions are saved
+        self.playing = set()  # guilds with a song playing, their position changes all the time
+        self._dirty = set()
+        self._last_positions = 0.0
+
+    def load(self, guild_id):
+        """Reads one guild's saved state, returns (rows, now_playing_row_or_None)."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT query, title, duration FROM queued_tracks WHERE guild_id = ? ORDER BY position",
+                (guild_id,),
+            ).fetchall()
+            playing = self._db.execute(
+                "SELECT query, title, duration, elapsed FROM now_playing WHERE guild_id = ?",
+                (guild_id,),
+            ).fetchone()
+        return rows, playing
+
+    def mark_dirty(self, guild_id):
+        self._dirty.add(guild_id)
+
+    def _take_batch(self):
+        now = time.monotonic()
+        if self.playing and now - self._last_positions >= self.position_interval:
+            self._dirty |= self.playing
+            self._last_positions = now
+
+        batch = []
+        for guild_id in self._dirty:
+            tracks, current, elapsed = self.snapshot(guild_id)
+            rows = [(guild_id, i, t.query, t.title, t.duration) for i, t in enumerate(tracks)]
+            playing = (guild_id, current.query, current.title, current.duration, elapsed, time.time()) if current else None
+            batch.append((guild_id, rows, playing))
+        self._dirty.clear()
+        return batch
+
+    def _write(self, batch):
+        with self._db:  # one transaction for the whole batch
+            for guild_id, rows, playing in batch:
+                self._db.execute("DELETE FROM queued_tracks WHERE guild_id = ?", (guild_id,))
+                self._db.executemany("INSERT INTO queued_tracks VALUES (?, ?, ?, ?, ?)", rows)
+                if playing:
+                    self._db.execute("INSERT OR REPLACE INTO now_playing VALUES (?, ?, ?, ?, ?, ?)", playing)
+                else:
+                    self._db.execute("DELETE FROM now_playing WHERE guild_id = ?", (guild_id,))
+
+    def flush(self):
+        """Writes whatever is still pending, including current playback positions."""
+        self._dirty |= self.playing
+        super().flush()
@@ -0,0 +1,94 @@
+import asyncio
+from collections import deque
+import discord
+
+
+class _Channel:
+    __slots__ = ("pending", "panel", "shown", "message", "last_post", "task")
+
+    def __init__(self, lines):
+        self.pending = []  # lines posted since the last flush
+        self.panel = None  # e.g. the queue, shown under the lines until the next flush
+        self.shown = deque(maxlen=lines)  # lines already in `message`
+        self.message = None  # our status message, edited while it's still the newest one
+        self.last_post = 0.0
+        self.task = None
+
+
+class StatusBoard:
+    """The music status lines ("Added to queue", "Now playing", ...) of one channel, merged into one message.
+
+    Lines posted close together wait until the channel has been quiet for
+    `delay` seconds (but never longer than `max_delay`) and then go out as one
+    message. If our last status message is still the newest message in the
+    channel it is edited instead, keeping the last `lines` lines. Each channel
+    has one task doing its sends, so they never overlap or arrive out of order.
+    """
+
+    def __init__(self, delay=0.3, max_delay=1.0, lines=5):
+        self.delay = delay
+        self.max_delay = max_delay
+        self.lines = lines
+        self._channels = {}  # channel id -> _Channel
+        self.posts = 0
+        self.sends = 0
+        self.edits = 0
+
+    def post(self, channel, line=None, panel=None):
+        """Shows `line` (and/or replaces the panel) in the channel's status message soon."""
+        state = self._channels.get(channel.id)
+        if state is None:
+            state = self._channels[channel.id] = _Channel(self.lines)
+        if line:
+            state.pending.append(line)
+        if panel is not None:
+            state.panel = panel
+        self.posts += 1
+        state.last_post = asyncio.get_running_loop().time()
+        if state.task is None:
+            state.task = asyncio.ensure_future(self._run(channel, state))
+
+    async def _run(self, channel, state):
+        loop = asyncio.get_running_loop()
+        try:
+            while state.pending or state.panel is not None:
+                first = loop.time()
+                while True:
+                    now = loop.time()
+                    quiet_at = min(state.last_post + self.delay, first + self.max_delay)
+                    if now >= quiet_at:
+                        break
+                    await asyncio.sleep(quiet_at - now)
+                await self._flush(channel, state)
+        finally:
+            state.task = None
+
+    async def _flush(self, channel, state):
+        pending, panel = state.pending, state.panel
+        state.pending, state.panel = [], None
+        message = state.message
+        if message is not None and channel.last_message_id == message.id:
+            state.shown.extend(pending)
+            try:
+                await message.edit(content=self._render(state.shown, panel))
+                self.edits += 1
+                return
+            except discord.NotFound:
+                pass  # somebody deleted it, send a new one
+            except discord.HTTPException as e:
+                print(f"Couldn't edit the status message: {e}")
+                return
+        state.shown = deque(pending, maxlen=self.lines)
+        try:
+            state.message = await channel.send(self._render(state.shown, panel))
+            self.sends += 1
+        except discord.HTTPException as e:
+            state.message = None
+            print(f"Couldn't send the status message: {e}")
+
+    @staticmethod
+    def _render(lines, panel):
+        text = "\n".join(lines)
+        if panel:
+            text = f"{text}\n\n{panel}" if text else panel
+        return text[:2000]  # Discord's message limit
@@ -0,0 +1,149 @@
+# The on-disk audio cache (audio_cache.py) used the way the player uses it, without YouTube.
+#
+# Fake resolved tracks pointing at small Ogg/Opus files made here go through
+# make_audio_source() like a real !play. Without ffmpeg on the PATH a stand-in
+# that only copies files is used, which is all the cache needs for Opus input
+# (POSIX only).
+#
+# usage: python -m pytest Music_Bot/test_audio_cache.py
+import os
+import sys
+import stat
+import shutil
+import struct
+import asyncio
+import pytest
+import audio_source
+from audio_cache import AudioCache, CachedOpusAudio
+
+FFMPEG_OPTS = {"before_options": "", "options": "-vn"}
+PACKETS = 50  # one second of 20 ms Opus frames
+SILENCE = b"\xf8\xff\xfe"  # an Opus packet holding 20 ms of silence
+
+
+def _crc(data):
+    crc = 0
+    for byte in data:
+        crc ^= byte << 24
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x04C11DB7 if crc & 0x80000000 else crc << 1) & 0xFFFFFFFF
+    return crc
+
+
+def _page(packet, number, granule, flag=0):
+    segments = bytes([255] * (len(packet) // 255) + [len(packet) % 255])
+    header = b"OggS" + struct.pack("<BBQIIIB", 0, flag, granule, 1, number, 0, len(segments))
+    page = bytearray(header + segments + packet)
+    page[22:26] = struct.pack("<I", _crc(page))
+    return bytes(page)
+
+
+def write_song(path, packets=PACKETS):
+    """Writes a valid Ogg/Opus file of `packets` silent frames, one packet per page."""
+    head = b"OpusHead" + struct.pack("<BBHIhB", 1, 2, 312, 48000, 0, 0)
+    tags = b"OpusTags" + struct.pack("<I", 5) + b"check" + struct.pack("<I", 0)
+    with open(path, "wb") as f:
+        f.write(_page(head, 0, 0, flag=2))
+        f.write(_page(tags, 1, 0))
+        for i in range(packets):
+            f.write(_page(SILENCE, i + 2, 312 + (i + 1) * 960, flag=4 if i == packets - 1 else 0))
+
+
+def request(song, page):
+    """What TrackExtractor.resolve() would hand the player for this song."""
+    return {"title": page, "url": song, "webpage_url": page, "duration": 1, "acodec": "opus", "abr": 128}
+
+
+@pytest.fixture
+def songs(tmp_path, monkeypatch):
+    """Two songs on disk as (one, two) resolved tracks, with an ffmpeg to play them."""
+    if shutil.which("ffmpeg") is None:
+        if os.name != "posix":
+            pytest.skip("needs ffmpeg on the PATH")
+        # an "ffmpeg" that copies `-i <file>` to its output file and ignores pipes
+        path = tmp_path / "ffmpeg"
+        path.write_text(f"#!{sys.executable}\n"
+                        "import sys, shutil\n"
+                        "args = sys.argv[1:]\n"
+                        "if not args[-1].startswith('pipe:'):\n"
+                        "    shutil.copyfile(args[args.index('-i') + 1], args[-1])\n")
+        path.chmod(path.stat().st_mode | stat.S_IEXEC)
+        monkeypatch.setenv("PATH", f"{tmp_path}{os.pathsep}{os.environ['PATH']}")
+    (tmp_path / "songs").mkdir()
+    for name in ("one", "two"):
+        write_song(tmp_path / "songs" / f"{name}.opus")
+    return [request(str(tmp_path / "songs" / f"{name}.opus"), f"https://example.com/watch?v={name}")
+            for name in ("one", "two")]
+
+
+@pytest.fixture
+def use_cache(tmp_path, monkeypatch):
+    """Returns a function that makes the player use a new AudioCache in one directory."""
+    def make(**kwargs):
+        cache = AudioCache(str(tmp_path / "cache"), min_plays=2, **kwargs)
+        monkeypatch.setattr(audio_source, "audio_cache", cache)
+        return cache
+    return make
+
+
+async def play(info, **kwargs):
+    """Plays a song through, returns (came from the cache, packets read)."""
+    source = await audio_source.make_audio_source(info, FFMPEG_OPTS, **kwargs)
+    cached = isinstance(source, CachedOpusAudio)
+    packets = 0
+    if cached:
+        while source.read():
+            packets += 1
+    source.cleanup()
+    return cached, packets
+
+
+async def filled(cache):
+    for _ in range(200):
+        if not cache._filling:
+            return
+        await asyncio.sleep(0.05)
+
+
+def test_cached_after_second_play(songs, use_cache, tmp_path):
+    one, _ = songs
+
+    async def run():
+        cache = use_cache()
+        cached, _ = await play(one)
+        await filled(cache)
+        assert not cached and cache.misses == 1 and not os.listdir(tmp_path / "cache")
+        cached, _ = await play(one)
+        await filled(cache)
+        assert not cached and len(cache._entries) == 1
+        cached, packets = await play(one)
+        # the two header packets come out too, like with FFmpegOpusAudio
+        assert cached and packets == PACKETS + 2 and cache.hits == 1
+        cached, _ = await play(one, start_at=30)
+        assert not cached and cache.hits == 1, "starting part way in skips the cache"
+
+    asyncio.run(run())
+
+
+def test_restart_keeps_songs_and_evicts_over_budget(songs, use_cache, tmp_path):
+    one, two = songs
+
+    async def run():
+        cache = use_cache()
+        for _ in range(2):
+            await play(one)
+            await filled(cache)
+        (tmp_path / "cache" / "half.opus.tmp").write_bytes(b"OggS")  # what a crash in the middle of a fill leaves behind
+
+        cache = use_cache(max_bytes=cache._size * 3 // 2)
+        cached, _ = await play(one)
+        assert cached and not any(name.endswith(".tmp") for name in os.listdir(tmp_path / "cache"))
+
+        for _ in range(2):
+            await play(two)
+            await filled(cache)
+        cached_one, _ = await play(one)
+        cached_two, _ = await play(two)
+        assert not cached_one and cached_two, "over budget the least recently used song goes"
+
+    asyncio.run(run())
@@ -0,0 +1,101 @@
+import random
+from collections import deque
+from itertools import islice
+
+PAGE_SIZE = 10
+
+
+def format_duration(seconds):
+    """3:45 style duration, or an empty string when we don't know it yet."""
+    if not seconds:
+        return ""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02}:{seconds:02}" if hours else f"{minutes}:{seconds:02}"
+
+
+class Track:
+    """One queued song. Starts as just the user's query and gets filled in once resolved."""
+    __slots__ = ("query", "title", "duration", "resolved", "start_at")
+
+    def __init__(self, query, title=None, duration=None, resolved=False, start_at=0):
+        self.query = query
+        self.title = title or query
+        self.duration = duration
+        self.resolved = resolved
+        self.start_at = start_at  # seconds to skip, set when resuming a song after a restart
+
+    def update(self, info):
+        """Fills in the details from a resolved yt-dlp info dict."""
+        self.title = info.get("title") or self.title
+        self.duration = info.get("duration")
+        self.resolved = True
+
+    def __str__(self):
+        length = format_duration(self.duration)
+        return f"{self.title} ({length})" if length else self.title
+
+
+class TrackQueue:
+    """A guild's song queue. Adding and taking songs is O(1) no matter how long it gets."""
+
+    def __init__(self):
+        self._tracks = deque()
+
+    def __len__(self):
+        return len(self._tracks)
+
+    def __iter__(self):
+        return iter(self._tracks)
+
+    def append(self, track):
+        self._tracks.append(track)
+        return len(self._tracks)  # its position in the queue
+
+    def popleft(self):
+        return self._tracks.popleft()
+
+    def peek(self):
+        """The next song to play, or None when the queue is empty."""
+        return self._tracks[0] if self._tracks else None
+
+    def clear(self):
+        self._tracks.clear()
+
+    # positions below are 1-based, the same numbers users see in the queue list
+    def insert(self, position, track):
+        position = min(max(position, 1), len(self._tracks) + 1)
+        self._tracks.insert(position - 1, track)
+        return position
+
+    def remove(self, position):
+        """Removes and returns the song at `position`, raises IndexError if there isn't one."""
+        if not 1 <= position <= len(self._tracks):
+            raise IndexError(position)
+        track = self._tracks[position - 1]
+        del self._tracks[position - 1]
+        return track
+
+    def move(self, source, target):
+        """Moves the song at `source` to `target` and returns it."""
+        track = self.remove(source)
+        self.insert(target, track)
+        return track
+
+    def shuffle(self):
+        tracks = list(self._tracks)  # shuffling a list is O(n), index juggling a deque is not
+        random.shuffle(tracks)
+        self._tracks = deque(tracks)
+
+    def page_count(self, per_page=PAGE_SIZE):
+        return max(1, -(-len(self._tracks) // per_page))
+
+    def render_page(self, page=1, title="🎶 Queue", per_page=PAGE_SIZE):
+        """Text for one page of the queue, only that page's songs are looked at."""
+        if not self._tracks:
+            return f"{title}: empty"
+        pages = self.page_count(per_page)
+        page = min(max(page, 1), pages)
+        start = (page - 1) * per_page
+        lines = [f"{i}. {track}" for i, track in enumerate(islice(self._tracks, start, start + per_page), start + 1)]
+        return f"{title} (page {page}/{pages}, {len(self._tracks)} songs):\n" + "\n".join(lines)
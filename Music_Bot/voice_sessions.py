@@ -0,0 +1,103 @@
+import time
+import asyncio
+
+
+class VoiceSessions:
+    """Keeps one voice connection per guild warm instead of connecting for every song.
+
+    connect() reuses the guild's connection (moving it to the asker's channel if
+    needed) and only opens a new one when there is none. When the queue runs out
+    the connection stays for `idle_timeout` seconds before leaving. When nobody
+    but bots is left in the channel for `empty_timeout` seconds the session is
+    torn down: `on_teardown(guild, reason)` runs first so the player can save and
+    stop its state, then the voice client disconnects, which stops ffmpeg.
+    Feed it every on_voice_state_update with update().
+    """
+
+    def __init__(self, idle_timeout=300.0, empty_timeout=30.0, on_teardown=None, observe=None):
+        self.idle_timeout = idle_timeout
+        self.empty_timeout = empty_timeout
+        self.on_teardown = on_teardown
+        self.observe = observe  # called with each connect time in seconds
+        self.leaving = set()  # guild ids being torn down right now
+        self._idle = {}  # guild_id -> TimerHandle for the idle disconnect
+        self._empty = {}  # guild_id -> TimerHandle for the empty-channel teardown
+
+    async def connect(self, channel):
+        """Returns a voice client in `channel`, reusing (and moving) the guild's one when it has one."""
+        self.busy(channel.guild)
+        vc = channel.guild.voice_client
+        if vc is not None and vc.is_connected():
+            if vc.channel != channel:
+                await vc.move_to(channel)
+            self.check_listeners(channel.guild)
+            return vc
+        started = time.perf_counter()
+        vc = await channel.connect()
+        if self.observe:
+            self.observe(time.perf_counter() - started)
+        self.check_listeners(channel.guild)
+        return vc
+
+    def idle(self, guild):
+        """Nothing left to play, leave if nothing new comes in `idle_timeout` seconds."""
+        self._cancel(self._idle, guild.id)
+        self._idle[guild.id] = asyncio.get_running_loop().call_later(
+            self.idle_timeout, self._start_teardown, guild, "idle")
+
+    def busy(self, guild):
+        """Something is playing again, the connection is no longer idle."""
+        self._cancel(self._idle, guild.id)
+
+    def update(self, member, before, after):
+        """Call from on_voice_state_update: notices when our channel empties, fills up again, or we get moved."""
+        vc = member.guild.voice_client
+        if vc is None:
+            return
+        if member.id == vc.user.id:
+            if after.channel is None:
+                self._forget(member.guild.id)  # we were disconnected (or kicked), nothing to keep track of
+            else:
+                self.check_listeners(member.guild)
+        elif vc.channel in (before.channel, after.channel):
+            self.check_listeners(member.guild)
+
+    def check_listeners(self, guild):
+        vc = guild.voice_client
+        listeners = [m for m in vc.channel.members if not m.bot] if vc and vc.channel else []
+        if listeners:
+            self._cancel(self._empty, guild.id)
+        elif guild.id not in self._empty:
+            self._empty[guild.id] = asyncio.get_running_loop().call_later(
+                self.empty_timeout, self._start_teardown, guild, "empty")
+
+    async def disconnect(self, guild, reason="stop"):
+        """Tears the guild's session down now."""
+        self._forget(guild.id)
+        self.leaving.add(guild.id)
+        try:
+            if self.on_teardown:
+                self.on_teardown(guild, reason)
+            vc = guild.voice_client
+            if vc is not None:
+                await vc.disconnect()  # stops the player, which kills its ffmpeg
+        finally:
+            self.leaving.discard(guild.id)
+
+    @property
+    def idle_count(self):
+        """Connections that are only being kept warm."""
+        return len(self._idle)
+
+    def _start_teardown(self, guild, reason):
+        asyncio.ensure_future(self.disconnect(guild, reason))
+
+    def _forget(self, guild_id):
+        self._cancel(self._idle, guild_id)
+        self._cancel(self._empty, guild_id)
+
+    @staticmethod
+    def _cancel(timers, guild_id):
+        handle = timers.pop(guild_id, None)
+        if handle is not None:
+            handle.cancel()
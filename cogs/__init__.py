@@ -0,0 +1,144 @@
+# The bots' commands, split into cogs so every bot folder and host.py run the same code.
+#
+#   chat        BOT1's everyday commands (!info, !roll, !remindme, !userinfo, ...)
+#   polls       !poll and !closepoll, counted live from reactions
+#   moderation  word filter, !kick, !ban, !mute, !unmute
+#   games       !coinflip, !rps, !guess, !score, !leaderboard (BOT1 and FUN)
+#   jokes       !joke
+#   guess_ui    Guess_UI's button and modal guessing game
+#   music       Music_Bot's player
+import os
+import sys
+import time
+import discord
+from discord.ext import commands
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# the helper modules (score_store, scheduler, extractor, ...) still live next to the bot they were written for
+for folder in ("BOT1", "Guess_UI", "Music_Bot"):
+    path = os.path.join(ROOT, folder)
+    if path not in sys.path:
+        sys.path.append(path)
+
+from metrics import Metrics  # noqa: E402  (needs the path above)
+from conversations import Conversations  # noqa: E402
+from member_cache import ActiveMembers, MemberLookup  # noqa: E402
+
+
+class Bot(commands.Bot):
+    """commands.Bot plus `message_filters`: async functions that can stop a message before it runs a command,
+    and `conversations`, an indexed wait_for for commands that wait for somebody's reply.
+
+    With METRICS_PORT set it also times every command, event and message filter
+    and serves the numbers on http://127.0.0.1:<port>/metrics (`bot.metrics`).
+
+    With `lean_members` (or LEAN_MEMBERS=1) the member lists aren't downloaded
+    at startup or kept; `active_members` remembers who talked lately and
+    `member_lookup` keeps the members we had to ask Discord for a few minutes.
+    """
+
+    def __init__(self, *args, lean_members=None, **kwargs):
+        if lean_members is None:
+            lean_members = os.getenv("LEAN_MEMBERS", "").lower() in ("1", "true", "yes")
+        if lean_members:
+            flags = discord.MemberCacheFlags.from_intents(kwargs["intents"])
+            flags.joined = False  # only members in voice channels stay cached (the music cog needs those)
+            kwargs.setdefault("member_cache_flags", flags)
+            kwargs.setdefault("chunk_guilds_at_startup", False)
+        super().__init__(*args, **kwargs)
+        self.active_members = ActiveMembers(int(os.getenv("ACTIVE_MEMBERS", "500"))) if lean_members else None
+        self.member_lookup = MemberLookup(ttl=int(os.getenv("MEMBER_TTL", "300"))) if lean_members else None
+        self.message_filters = []
+        self.conversations = Conversations()
+        self.scheduler = None
+        self.jokes = None
+        self.metrics = None
+        if os.getenv("METRICS_PORT"):
+            self.metrics = Metrics(port=int(os.getenv("METRICS_PORT")))
+            self.metrics.gauge("discord_heartbeat_seconds", lambda: self.latency, "Gateway heartbeat latency")
+            self.metrics.gauge("discord_guilds", lambda: len(self.guilds))
+            self.before_invoke(self._start_timer)
+            self.after_invoke(self._stop_timer)
+
+    async def start(self, token, *, reconnect=True):
+        if self.metrics:
+            await self.metrics.start()
+        await super().start(token, reconnect=reconnect)
+
+    async def close(self):
+        await super().close()
+        if self.jokes is not None:  # an empty buffer is falsy (len 0) but still has a session open
+            await self.jokes.close()  # the pooled HTTP session goes with the bot
+
+    def add_alias(self, name, alias):
+        """Lets `!alias` run the command `name` too.
+
+        The standalone launchers use this to keep a command's old name where
+        nothing else claims it (in host.py !guess is the games cog's).
+        """
+        command = self.remove_command(name)
+        command.aliases = [*command.aliases, alias]
+        self.add_command(command)
+
+    async def _start_timer(self, ctx):
+        ctx.started_at = time.perf_counter()
+
+    async def _stop_timer(self, ctx):
+        # runs even when the command failed, but not when a check stopped it before it started
+        self.metrics.observe("discord_command_seconds", time.perf_counter() - ctx.started_at,
+                             command=ctx.command.qualified_name, failed=str(ctx.command_failed).lower())
+
+    async def _run_event(self, coro, event_name, *args, **kwargs):
+        if self.metrics is None:
+            return await super()._run_event(coro, event_name, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            await super()._run_event(coro, event_name, *args, **kwargs)
+        finally:
+            self.metrics.observe("discord_event_seconds", time.perf_counter() - start, event=event_name)
+
+    async def on_message(self, message):
+        if self.active_members is not None and message.guild and not message.author.bot:
+            self.active_members.seen(message.guild.id, message.author.id, str(message.author))
+        start = time.perf_counter()
+        blocked = False
+        for message_filter in self.message_filters:
+            if await message_filter(message):
+                blocked = True
+                break
+        if self.metrics and self.message_filters:
+            self.metrics.observe("discord_message_filter_seconds", time.perf_counter() - start, blocked=str(blocked).lower())
+        if not blocked:
+            self.conversations.feed(message)
+            await self.process_commands(message)
+
+
+def get_scheduler(bot):
+    """The bot's one Scheduler, shared by every cog with timed jobs (reminders, unmutes)."""
+    if bot.scheduler is None:
+        from scheduler import Scheduler
+        bot.scheduler = Scheduler(os.getenv("SCHEDULE_DB", "schedule.db"))
+    return bot.scheduler
+
+
+def get_jokes(bot):
+    """The bot's one JokeBuffer, shared by !joke and the guessing game's winner joke.
+
+    JOKE_API_URL points it somewhere else (a local stub server for testing),
+    JOKE_BUFFER sets how many jokes are kept ready, JOKE_BUDGET_MS how long the
+    API gets before our own jokes (JOKE_CORPUS) answer instead, and
+    JOKE_BLACKLIST which flags (e.g. "nsfw,racist") are never told.
+    """
+    if bot.jokes is None:
+        from joke_buffer import JokeBuffer, JOKE_URL
+        from joke_corpus import JokeCorpus
+        blacklist = os.getenv("JOKE_BLACKLIST", "")
+        bot.jokes = JokeBuffer(
+            os.getenv("JOKE_API_URL", JOKE_URL),
+            depth=int(os.getenv("JOKE_BUFFER", "10")),
+            budget=int(os.getenv("JOKE_BUDGET_MS", "150")) / 1000,
+            corpus=JokeCorpus.load(os.getenv("JOKE_CORPUS", os.path.join(ROOT, "Guess_UI", "jokes.json"))),
+            blacklist=[flag.strip() for flag in blacklist.split(",") if flag.strip()],
+        )
+    return bot.jokes
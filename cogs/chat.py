@@ -0,0 +1,164 @@
+import random
+import datetime
+import discord
+from discord.ext import commands
+from cogs import get_scheduler
+
+secret_role = "Gamer"
+
+
+def to_upper(argument):
+    return argument.upper()
+
+
+class Slapper(commands.Converter):
+    async def convert(self, ctx, argument):
+        if ctx.bot.active_members is not None:
+            # lean member cache: there's no member list, pick one of the people who talked lately
+            to_slap = ctx.bot.active_members.pick(ctx.guild.id) or ctx.author
+        else:
+            to_slap = random.choice(ctx.guild.members)
+        return f'{ctx.author} slapped {to_slap} because *{argument}*'
+
+
+class LookedUpMember(commands.MemberConverter):
+    """discord.Member, but with a lean member cache the members we had to ask Discord for are kept a while."""
+
+    async def convert(self, ctx, argument):
+        lookup = ctx.bot.member_lookup
+        if lookup is None or ctx.guild is None:
+            return await super().convert(ctx, argument)
+        member = lookup.get(ctx.guild.id, argument)
+        if member is None:
+            member = await super().convert(ctx, argument)
+            lookup.put(ctx.guild.id, argument, member)
+        return member
+
+
+class Chat(commands.Cog):
+    """BOT1's everyday commands."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        # reminders wait here instead of in a sleeping command, and survive restarts
+        self.scheduler = get_scheduler(bot)
+        self.scheduler.on("reminder")(self.send_reminder)
+
+    def cog_unload(self):
+        self.scheduler.handlers.pop("reminder", None)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.scheduler.start()
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        await member.send(f"Welcome to the server {member.name}")
+
+    @commands.command()
+    async def info(self, ctx):
+        embed = discord.Embed(
+            title ="🤖 Chat Buddy Bot",
+            description="I can tell jokes, roll dice, and more!",
+            color=discord.Color.blue()
+        )
+        embed.add_field(name="!joke", value="Tells a random joke.", inline=False)
+        embed.add_field(name="!roll", value="Rolls a dice 🎲", inline=False)
+        embed.add_field(name="!info", value="Shows this help box 📘", inline=False)
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    async def roll(self, ctx):
+        number = random.randint(1, 6)
+        await ctx.send(f"🎲 You rolled a {number}!")
+
+    # !hello
+    @commands.command()
+    async def hello(self, ctx):
+        await ctx.send(f"Hello {ctx.author.mention}!")
+
+    @commands.command()
+    async def assign(self, ctx):
+        role = discord.utils.get(ctx.guild.roles, name=secret_role)
+        if role:
+            await ctx.author.add_roles(role)
+            await ctx.send(f"{ctx.author.mention} is now assigned to {secret_role}")
+        else:
+            await ctx.send("Role doesn't exist")
+
+    @commands.command()
+    async def remove(self, ctx):
+        role = discord.utils.get(ctx.guild.roles, name=secret_role)
+        if role:
+            await ctx.author.remove_roles(role)
+            await ctx.send(f"{ctx.author.mention} is now removed from {secret_role}")
+        else:
+            await ctx.send("Role doesn't exist")
+
+    # !dm (Hello World)msg
+    @commands.command()
+    async def dm(self, ctx, *, msg):
+        await ctx.author.send(f"You said {msg}")
+
+    @commands.command()
+    async def reply(self, ctx):
+        await ctx.reply("This is a reply to your message!")
+
+    @commands.command()
+    @commands.has_role(secret_role)
+    async def secret(self, ctx):
+        await ctx.send("Welcome to the club!")
+
+    @secret.error
+    async def secret_error(self, ctx, error):
+        if isinstance(error, commands.MissingRole):
+            await ctx.send("You don't have permission to do that!")
+
+    @commands.command()
+    async def remindme(self, ctx,seconds:int,*,task:str):
+        job_id = self.scheduler.add("reminder", seconds, {"channel_id": ctx.channel.id, "user_id": ctx.author.id, "task": task})
+        await ctx.send(f"⏰ Okay! I’ll remind you in {seconds} seconds to: **{task}** (`!forget {job_id}` to cancel)")
+
+    async def send_reminder(self, job):
+        channel = self.bot.get_channel(job["channel_id"]) or await self.bot.fetch_channel(job["channel_id"])
+        await channel.send(f"🔔 Reminder: <@{job['user_id']}>, don’t forget to {job['task']}!")
+
+    @commands.command()
+    async def forget(self, ctx, reminder_id: int):
+        job = self.scheduler.get(reminder_id)
+        if not job or job[0] != "reminder" or job[1]["user_id"] != ctx.author.id:
+            await ctx.send("❌ You don't have a reminder with that number.")
+            return
+        self.scheduler.cancel(reminder_id)
+        await ctx.send(f"🗑️ Reminder {reminder_id} cancelled.")
+
+    @commands.command()
+    async def userinfo(self, ctx,member:LookedUpMember = None):
+        member = member or ctx.author
+        embed = discord.Embed(
+            title=f"User Info - {member}",
+            color=discord.Color.green(),
+            timestamp = datetime.datetime.now()
+        )
+        embed.add_field(name="👤 Username", value=member.name, inline=True)
+        embed.add_field(name="🆔 ID", value=member.id, inline=True)
+        embed.add_field(name="📅 Joined Discord", value=member.created_at.strftime("%Y-%m-%d"), inline=False)
+        embed.add_field(name="📅 Joined Server", value=member.joined_at.strftime("%Y-%m-%d"), inline=False)
+        embed.set_thumbnail(url=member.avatar.url if member.avatar else member.default_avatar.url)
+        await ctx.send(embed=embed)
+
+    @commands.command()
+    async def add(self, ctx, a: int, b: int):
+        await ctx.send(a + b)
+
+    @commands.command()
+    async def up(self, ctx, *, content: to_upper):
+        await ctx.send(content)
+
+    @commands.command()
+    async def slap(self, ctx, *, reason: Slapper):
+        await ctx.send(reason)
+
+
+async def setup(bot):
+    await bot.add_cog(Chat(bot))
@@ -0,0 +1,114 @@
+import os
+import random
+import asyncio
+import discord
+from discord.ext import commands
+from score_store import ScoreStore
+
+
+def score_guild(ctx):
+    # scores are kept per server, DMs all count as "server" 0
+    return ctx.guild.id if ctx.guild else 0
+
+
+class Games(commands.Cog):
+    """Coin flips, rock paper scissors and number guessing, with a scoreboard."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        # wins/losses/ties per server, buffered in memory and saved to SQLite every few seconds
+        self.scores = ScoreStore(os.getenv("SCORES_DB", "scores.db"))
+
+    async def cog_load(self):
+        self.scores.start()
+
+    def cog_unload(self):
+        self.scores.close()  # write the last buffered scores
+
+    @commands.command()
+    async def coinflip(self, ctx):
+        result = random.choice(["Heads", "Tails"])
+        await ctx.send(f"🪙 The coin landed on **{result}**!")
+
+    @commands.command()
+    async def rps(self, ctx, choice: str):
+        options = ["rock", "paper", "scissors"]
+        choice = choice.lower()
+        if choice not in options:
+            await ctx.send("❌ Please choose rock, paper, or scissors. Example: `!rps rock`")
+            return
+        bot_choice = random.choice(options)
+
+        #decide result
+        if choice == bot_choice:
+            result = "tie"
+        elif (choice == "rock" and bot_choice == "scissors") or \
+             (choice == "paper" and bot_choice == "rock") or \
+             (choice == "scissors" and bot_choice == "paper"):
+            result = "win"
+        else:
+            result = "lose"
+
+        # update scoreboard
+        self.scores.record(score_guild(ctx), ctx.author.id, result)
+
+        # friendly message
+        emoji = {"win": "🎉 You win!", "lose": "😢 I win!", "tie": "🤝 It's a tie!"}
+        await ctx.send(f"You chose **{choice}**. I chose **{bot_choice}**. {emoji[result]}")
+
+    @commands.command()
+    async def guess(self, ctx, low: int = 1, high: int = 10):
+        if low >= high:
+            await ctx.send("⚠️ Invalid range. Make sure low < high. Example: `!guess 1 20`")
+            return
+
+        number = random.randint(low, high)
+        attempts = 5
+        await ctx.send(f"🔢 I'm thinking of a number between {low} and {high}. You have {attempts} tries. Type your guess!")
+
+        def check(m):
+            return m.content.isdigit()  # the author and channel are already matched by the dispatcher
+
+        for _ in range(attempts):
+            try:
+                msg = await self.bot.conversations.wait(ctx.channel.id, ctx.author.id, check=check, timeout=30.0)
+            except asyncio.TimeoutError:
+                await ctx.send(f"⏲️ Time's up! The number was **{number}**.")
+                return
+
+            guess_num = int(msg.content)
+            if guess_num == number:
+                await ctx.send("🎉 Correct! You guessed the number!")
+                return
+            elif guess_num < number:
+                await ctx.send("🔺 Higher!")
+            else:
+                await ctx.send("🔻 Lower!")
+
+        await ctx.send(f"❌ Out of attempts! The number was **{number}**.")
+
+    @commands.command()
+    async def score(self, ctx, member: discord.Member = None):
+        member = member or ctx.author
+        s = self.scores.get(score_guild(ctx), member.id)
+        await ctx.send(f"📊 {member.display_name} — Wins: {s['wins']}, Losses: {s['losses']}, Ties: {s['ties']}")
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def reset_scores(self, ctx):
+        self.scores.reset(score_guild(ctx))
+        await ctx.send("✅ All scores have been reset.")
+
+    @commands.command()
+    async def leaderboard(self, ctx, limit: int = 10):
+        rows = self.scores.top(score_guild(ctx), min(max(limit, 1), 25))
+        if not rows:
+            await ctx.send("📊 Nobody has played yet!")
+            return
+        lines = [f"{i}. <@{uid}> — Wins: {w}, Losses: {l}, Ties: {t}" for i, (uid, w, l, t) in enumerate(rows, 1)]
+        embed = discord.Embed(title="🏆 Leaderboard", description="\n".join(lines), color=discord.Color.gold())
+        await ctx.send(embed=embed)
+
+
+async def setup(bot):
+    await bot.add_cog(Games(bot))
@@ -0,0 +1,114 @@
+import os
+import random
+import discord
+from discord.ext import commands
+from discord.ui import View, Button, Modal, TextInput
+from cogs.jokes import fetch_joke
+from cogs import get_jokes
+from game_store import GameStore
+
+pre_game_messages = [
+    "Get ready to guess!",
+    "Let's see if you can guess the number!",
+    "The guessing game is about to begin!"
+]
+
+
+class RangeInputModel(Modal):
+    def __init__(self, ctx, games):
+        super().__init__(title ="Set Game Range")
+        self.ctx = ctx
+        self.games = games
+        self.range_input = TextInput(label="Enter the maximum range", placeholder="e.g., 100")
+        self.add_item(self.range_input)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        try:
+            max_range = int(self.range_input.value)
+            if max_range < 1:
+                await interaction.response.send_message("Please enter a number greater than 1.", ephemeral=True)
+                return
+        except ValueError:
+            await interaction.response.send_message("Please enter a valid number.", ephemeral=True)
+            return
+
+        secret_number = random.randint(1, max_range)
+        self.games.new_game(self.ctx.author.id, secret_number)
+        await interaction.response.send_message(
+            f"Game started! I'm thinking of a number between 1 and {max_range}. Start guessing with `!try <your number>`."
+        )
+
+
+class StartGameView(View):
+    def __init__(self, ctx, games):
+        super().__init__()
+        self.ctx = ctx
+        self.games = games
+
+    @discord.ui.button(label="Start", style=discord.ButtonStyle.green)
+    async def start_button(self, interaction: discord.Interaction, button: Button):
+        if self.ctx.author.id in self.games:
+            await interaction.response.send_message(
+                "You already have an active game! Finish it before starting a new one.",
+                ephemeral=True
+            )
+            return
+        modal = RangeInputModel(self.ctx, self.games)
+        await interaction.response.send_modal(modal)
+
+    @discord.ui.button(label="Cancel", style=discord.ButtonStyle.red)
+    async def cancel_button(self, interaction: discord.Interaction, button:Button):
+        await interaction.response.send_message("Game setup canceled.", ephemeral=True)
+
+
+class GuessUI(commands.Cog):
+    """The guessing game with a Start button and a range modal."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        # games left alone for GUESS_TTL seconds are dropped; with GUESS_DB set they also survive restarts
+        self.games = GameStore(os.getenv("GUESS_DB"), ttl=int(os.getenv("GUESS_TTL", 30 * 60)))
+
+    async def cog_load(self):
+        self.games.start()
+        get_jokes(self.bot).start()  # the winner's joke is ready before they win
+
+    def cog_unload(self):
+        self.games.close()
+
+    @commands.command(name="startGuess")
+    async def start_guess_ui(self, ctx):
+        await ctx.send(random.choice(pre_game_messages))
+
+        view = StartGameView(ctx, self.games)
+        await ctx.send("Ready to start the game?", view=view)
+
+    # called !try and not !guess, that one is the games cog's number guessing
+    @commands.command(name="try")
+    async def try_number(self, ctx,user_guess: int):
+        game = self.games.get(ctx.author.id)
+
+        if game:
+            self.games.touch(ctx.author.id)
+            secret_number = game.secret_number
+
+            if user_guess < secret_number:
+                await ctx.send("You guessed too low!")
+            elif user_guess > secret_number:
+                await ctx.send("You guessed too high!")
+            else:
+                attempts = game.attempts
+
+                joke_text = await fetch_joke(self.bot, ctx.channel.id)
+
+                await ctx.send(f'🎉Congrats {ctx.author.mention}! You guessed the number {secret_number} in {attempts} tries! ')
+                await ctx.send(f'Here is a dark joke for you : {joke_text}')
+
+                self.games.end(ctx.author.id)
+
+        else:
+            await ctx.send(f"{ctx.author.mention}, you haven't started a game yes! Type `!startGuess`to begin.")
+
+
+async def setup(bot):
+    await bot.add_cog(GuessUI(bot))
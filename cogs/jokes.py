@@ -0,0 +1,31 @@
+from discord.ext import commands
+from cogs import get_jokes
+
+# what JokeAPI (and our own jokes.json) sorts jokes into
+categories = ["Programming", "Misc", "Dark", "Pun", "Spooky", "Christmas"]
+
+
+async def fetch_joke(bot, channel_id=None, category=None):
+    """A joke from the bot's prefetched buffer, the API (if it's quick) or our own jokes."""
+    return await get_jokes(bot).get(channel_id, category)
+
+
+class Jokes(commands.Cog):
+    """!joke, shared by BOT1 and Guess_UI/joke.py."""
+
+    def __init__(self, bot):
+        self.bot = bot
+
+    async def cog_load(self):
+        get_jokes(self.bot).start()  # start filling the buffer before anybody asks
+
+    @commands.command(name= "joke")
+    async def joke(self, ctx, category: str = None):
+        if category and category.capitalize() not in categories:
+            await ctx.send(f"❌ Pick one of: {', '.join(categories)}. Example: `!joke pun`")
+            return
+        await ctx.send(await fetch_joke(self.bot, ctx.channel.id, category and category.capitalize()))
+
+
+async def setup(bot):
+    await bot.add_cog(Jokes(bot))
@@ -0,0 +1,118 @@
+import os
+import datetime
+import discord
+from discord.ext import commands
+from cogs import get_scheduler
+from word_filter import WordFilter
+from mute_setup import ensure_mute_role
+
+bad_words = ["stupid", "dumb", "idiot", "shit"]
+
+# "role" mutes with a Muted role, "timeout" uses Discord's own member timeouts (no per-channel setup, max 28 days)
+MUTE_MODE = os.getenv("MUTE_MODE", "role")
+
+
+class Moderation(commands.Cog):
+    """The bad word filter and the kick/ban/mute commands."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        # all the words are compiled into one pattern, so a long list no longer means one check per word.
+        # Put one word per line in the BAD_WORDS_FILE file to change the list without restarting the bot.
+        self.word_filter = WordFilter(
+            bad_words,
+            path=os.getenv("BAD_WORDS_FILE"),
+            whole_words=os.getenv("FILTER_WHOLE_WORDS") == "1",
+        )
+        # unmutes wait in the scheduler, so they still happen after a restart
+        self.scheduler = get_scheduler(bot)
+        self.scheduler.on("unmute")(self.lift_mute)
+
+    def cog_load(self):
+        self.bot.message_filters.append(self.filter_message)
+
+    def cog_unload(self):
+        self.bot.message_filters.remove(self.filter_message)
+        self.scheduler.handlers.pop("unmute", None)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.scheduler.start()
+
+    async def filter_message(self, message):
+        """Deletes messages with bad words, returns True so they don't run commands either."""
+        if message.author == self.bot.user:
+            return False # dont delete bot's own message
+
+        if self.word_filter.find(message.content):
+            await message.delete()
+            await message.channel.send(f"⚠️ Watch your language, {message.author.mention}!")
+            return True
+        return False
+
+    @commands.command()
+    @commands.has_permissions(kick_members=True)
+    async def kick(self, ctx, member:discord.Member, *, reason="No reason given"):
+        await member.kick(reason=reason)
+        await ctx.send(f"👢 {member.name} was kicked. Reason: {reason}")
+
+    @commands.command()
+    @commands.has_permissions(ban_members=True)
+    async def ban(self, ctx, member:discord.Member,*,reason="No reason given"):
+        await member.ban(reason=reason)
+        await ctx.send(f"🔨 {member.name} was banned. Reason: {reason}")
+
+    @commands.command()
+    @commands.has_permissions(manage_roles=True)
+    async def mute(self, ctx, member:discord.Member, seconds: int,*, reason="No reason given"):
+        if MUTE_MODE == "timeout":
+            # Discord lifts the timeout by itself, nothing to schedule
+            await member.timeout(datetime.timedelta(seconds=seconds), reason=reason)
+            await ctx.send(f"🔇 {member.mention} has been timed out for {seconds} seconds. Reason: {reason}")
+            return
+
+        # if role doesn’t exist, create one (its channel overwrites are set up in parallel, with progress updates)
+        mute_role = await ensure_mute_role(ctx.guild, ctx.channel)
+
+        await member.add_roles(mute_role,reason=reason)
+        await ctx.send(f"🔇 {member.mention} has been muted for {seconds} seconds. Reason: {reason}")
+
+        # muting again replaces the old timer instead of adding a second one
+        key = f"unmute:{ctx.guild.id}:{member.id}"
+        self.scheduler.cancel_key(key)
+        self.scheduler.add("unmute", seconds, {
+            "guild_id": ctx.guild.id,
+            "member_id": member.id,
+            "role_id": mute_role.id,
+            "channel_id": ctx.channel.id,
+        }, key=key)
+
+    async def lift_mute(self, job):
+        guild = self.bot.get_guild(job["guild_id"])
+        if guild is None:
+            return  # the bot isn't in that server anymore
+        role = guild.get_role(job["role_id"])
+        member = guild.get_member(job["member_id"]) or await guild.fetch_member(job["member_id"])
+        if role:
+            await member.remove_roles(role)
+        channel = guild.get_channel(job["channel_id"])
+        if channel:
+            await channel.send(f"🔊 {member.mention} is now unmuted.")
+
+    @commands.command()
+    @commands.has_permissions(manage_roles=True)
+    async def unmute(self, ctx, member:discord.Member):
+        if MUTE_MODE == "timeout":
+            await member.timeout(None)
+            await ctx.send(f"🔊 {member.mention} is now unmuted.")
+            return
+        jobs = self.scheduler.cancel_key(f"unmute:{ctx.guild.id}:{member.id}")
+        if not jobs:
+            await ctx.send(f"❌ {member.mention} isn't muted.")
+            return
+        # run the pending unmute right now instead of waiting for it
+        await self.lift_mute(jobs[0])
+
+
+async def setup(bot):
+    await bot.add_cog(Moderation(bot))
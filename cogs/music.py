@@ -0,0 +1,497 @@
+import os
+import logging
+import asyncio
+import time
+import discord
+from discord.ext import commands
+from extractor import TrackExtractor
+from audio_source import make_audio_source, get_audio_cache
+from prefetch import Prefetcher
+from track_queue import Track, TrackQueue
+from queue_store import QueueStore
+from status_board import StatusBoard
+from voice_sessions import VoiceSessions
+
+log = logging.getLogger("music")
+
+MAX_FAILED_TRACKS = 5  # songs in a row that failed to load before the queue is stopped
+
+# YTDLP SETTINGS
+ytdlp_opts = {
+    'format': 'bestaudio[acodec=opus]/bestaudio/best',  # prefer Opus so it can be passed straight through
+    'noplaylist': True,
+    'quiet': True,
+    'default_search': 'ytsearch',
+    '--extractor-args': "youtube:player_client=default"
+}
+
+# 🛠️ CRITICAL FIX: Ensure correct FFmpeg options for streaming.
+# The parameters below guarantee the output is raw PCM audio (s16le)
+# at the correct sample rate (48000 Hz) and channel count (2).
+ffmpeg_opts = {
+    'before_options':
+        '-reconnect 1 -reconnect_streamed 1 -reconnect_delay_max 5',  # Corrected typo in '-reconnect_streamed' spacing
+    'options': '-vn'
+    # -vn tells it to drop video stream. The other format options are implicitly handled by discord.py's FFmpegPCMAudio
+}
+
+# One long-lived extractor for the whole bot instead of a new YoutubeDL per song.
+# yt-dlp itself is only loaded by its worker processes, which start on the first lookup
+# unless the launcher starts them earlier (skip.py does, before bot.run()).
+extractor = TrackExtractor(ytdlp_opts)
+
+
+def load_opus():
+    # --- Opus Library Check (Enhanced) ---
+    if discord.opus.is_loaded():
+        return
+    try:
+        # Change "libopus.dll" to the correct filename for your OS (e.g., 'libopus.so' on Linux)
+        discord.opus.load_opus("libopus.dll")
+        print("Opus library loaded successfully.")
+    except Exception as e:
+        # Crucial for troubleshooting: informs the developer if the Opus file is missing
+        print(f"❌ ERROR: Failed to load Opus library: {e}")
+        print("Please ensure 'libopus.dll' (or the correct version for your OS) is in the bot's working directory.")
+
+
+class GuildQueues(dict):
+    """guild_id -> TrackQueue. A guild's saved queue is only loaded the first time that guild is used."""
+
+    def __init__(self, store):
+        super().__init__()
+        self.store = store
+
+    def __missing__(self, guild_id):
+        queue = TrackQueue()
+        rows, playing = self.store.load(guild_id)
+        if playing:
+            # the song that was playing goes first and picks up where it left off
+            query, title, duration, elapsed = playing
+            queue.append(Track(query, title, duration, start_at=elapsed))
+        for query, title, duration in rows:
+            queue.append(Track(query, title, duration))
+        self[guild_id] = queue
+        return queue
+
+
+class Music(commands.Cog):
+    """Music_Bot's player: queues, playlists, prefetching and skip."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.extractor = extractor
+        self.now_playing = {}  # guild_id -> (track, when it started playing)
+        self.volumes = {}  # guild_id -> volume set with !volume, 1.0 when not set
+        self.song_ended_at = {}  # guild_id -> when the last song finished, used to measure the gap to the next one
+        # Queues survive restarts: saved to SQLite in batches, read back one guild at a time
+        self.store = QueueStore(self.queue_snapshot, path=os.getenv("MUSIC_DB", "music_state.db"))
+        self.queue_dict = GuildQueues(self.store)
+        # Gets the next song in the queue ready while the current one is playing
+        self.prefetcher = Prefetcher(self.extractor, self.make_source)
+        # "Added", "Loading", "Now playing" and the queue go out as one message per burst, edited in place
+        self.status = StatusBoard(delay=float(os.getenv("MUSIC_STATUS_DELAY", "0.3")))
+        # one warm voice connection per guild: kept MUSIC_IDLE_TIMEOUT seconds after the queue ends,
+        # dropped MUSIC_EMPTY_TIMEOUT seconds after the last listener left
+        self.voice = VoiceSessions(
+            idle_timeout=float(os.getenv("MUSIC_IDLE_TIMEOUT", "300")),
+            empty_timeout=float(os.getenv("MUSIC_EMPTY_TIMEOUT", "30")),
+            on_teardown=self.session_ended,
+        )
+
+    async def cog_load(self):
+        self.store.start()
+        metrics = self.bot.metrics
+        if metrics:
+            cache = self.extractor.cache
+            metrics.gauge("music_queued_tracks", lambda: sum(len(queue) for queue in self.queue_dict.values()))
+            metrics.gauge("music_playing_guilds", lambda: len(self.now_playing))
+            metrics.gauge("music_extractions_running", lambda: self.extractor.running)
+            metrics.gauge("music_extractions_waiting", lambda: self.extractor.waiting)
+            metrics.gauge("music_track_cache_size", lambda: len(cache))
+            metrics.gauge("music_track_cache_hits_total", lambda: cache.hits, kind="counter")
+            metrics.gauge("music_track_cache_misses_total", lambda: cache.misses, kind="counter")
+            self.extractor.observe = lambda seconds: metrics.observe("music_extraction_seconds", seconds)
+            metrics.gauge("music_status_lines_total", lambda: self.status.posts, kind="counter")
+            metrics.gauge("music_status_sends_total", lambda: self.status.sends, kind="counter")
+            metrics.gauge("music_status_edits_total", lambda: self.status.edits, kind="counter")
+            metrics.gauge("music_voice_sessions", lambda: len(self.bot.voice_clients))
+            metrics.gauge("music_voice_idle_sessions", lambda: self.voice.idle_count)
+            self.voice.observe = lambda seconds: metrics.observe("music_voice_connect_seconds", seconds)
+
+    def cog_unload(self):
+        self.store.close()  # save the last changes and playback positions
+        if self.bot.metrics:
+            for name in ("music_queued_tracks", "music_playing_guilds", "music_extractions_running",
+                         "music_extractions_waiting", "music_track_cache_size", "music_track_cache_hits_total",
+                         "music_track_cache_misses_total", "music_status_lines_total",
+                         "music_status_sends_total", "music_status_edits_total", "music_voice_sessions",
+                         "music_voice_idle_sessions"):
+                self.bot.metrics.remove(name)
+            self.extractor.observe = None
+
+    async def make_source(self, info, start_at=0, guild_id=None):
+        """Builds the audio source discord.py plays for a resolved track."""
+        volume = (lambda: self.volumes.get(guild_id, 1.0)) if guild_id is not None else None
+        return await make_audio_source(info, ffmpeg_opts, start_at=start_at, volume=volume)
+
+    def queue_snapshot(self, guild_id):
+        """What the store saves for a guild: (queued tracks, now playing, seconds into it)."""
+        tracks = list(self.queue_dict[guild_id])
+        if guild_id not in self.now_playing:
+            return tracks, None, 0
+        track, started = self.now_playing[guild_id]
+        return tracks, track, track.start_at + time.monotonic() - started
+
+    def set_now_playing(self, guild_id, track):
+        if track:
+            self.now_playing[guild_id] = (track, time.monotonic())
+            self.store.playing.add(guild_id)
+        else:
+            self.now_playing.pop(guild_id, None)
+            self.store.playing.discard(guild_id)
+        self.store.mark_dirty(guild_id)
+
+    def prefetch_next(self, guild_id):
+        """Starts preparing the song at the front of the queue, or drops the old one if the queue is empty."""
+        if self.queue_dict[guild_id]:
+            self.prefetcher.schedule(guild_id, self.queue_dict[guild_id].peek().query)
+        else:
+            self.prefetcher.cancel(guild_id)
+
+    def session_ended(self, guild, reason):
+        """Called by VoiceSessions right before it leaves a guild's voice channel."""
+        guild_id = guild.id
+        self.prefetcher.cancel(guild_id)  # its ffmpeg is already running
+        self.song_ended_at.pop(guild_id, None)
+        if reason == "empty" and guild_id in self.now_playing:
+            # everybody left mid-song: keep it at the front so it continues where it stopped next time
+            tracks, track, elapsed = self.queue_snapshot(guild_id)
+            self.queue_dict[guild_id].insert(1, Track(track.query, track.title, track.duration, start_at=elapsed))
+        self.set_now_playing(guild_id, None)
+        log.info("Left voice in guild %s (%s)", guild_id, reason)
+
+    @commands.Cog.listener()
+    async def on_voice_state_update(self, member, before, after):
+        self.voice.update(member, before, after)
+
+    def say(self, ctx, line):
+        """Queues a status line for the channel, see StatusBoard."""
+        self.status.post(ctx.channel, line)
+
+    def queue_changed(self, guild_id):
+        """Call after anything edits a guild's queue."""
+        self.store.mark_dirty(guild_id)
+        self.prefetch_next(guild_id)
+
+    # --- Command Definitions ---
+    # !info belongs to the chat cog, so the music one is !musicinfo
+    @commands.command(name="musicinfo")
+    async def info(self, ctx):
+        """Gives info about the bot commands."""
+        embed = discord.Embed(
+            title="🎵 Music Buddy",
+            description="I can play music for yaa!",
+            color=discord.Color.green()
+        )
+        embed.add_field(name="!play <song name or URL>", value="plays music from YouTube/Spotify", inline=False)
+        embed.add_field(name="!pause", value="pause the song.", inline=False)
+        embed.add_field(name="!resume", value="resume the song.", inline=False)
+        embed.add_field(name="!stop", value="stop and leave the voice channel", inline=False)
+        embed.add_field(name="!queue <song>", value="add a song to the queue", inline=False)
+        embed.add_field(name="!playlist <URL>", value="add a whole playlist to the queue", inline=False)
+        embed.add_field(name="!showqueue [page]", value="show the queue, 10 songs per page", inline=False)
+        embed.add_field(name="!insert / !move / !unqueue / !shuffle", value="edit the queue", inline=False)
+        embed.add_field(name="!volume [0-200]", value="show or set the volume", inline=False)
+        await ctx.send(embed=embed)
+
+    # This code makes the bot automatically play the next song when the current song finishes — even though Discord can’t directly call async functions.
+    # next_song_callback:
+    # A helper who gets a phone call when the song ends.
+    # It tells the music bot: "Time for the next song!"
+    #
+    # (Because Discord can't call async functions directly,
+    # this helper sends the message to play_next safely.)
+    def next_song_callback(self, ctx): #translator
+        def _callback(error): #helper
+            if error:
+                print(f"Playback error: {error}")
+            self.song_ended_at[ctx.guild.id] = time.perf_counter()
+            asyncio.run_coroutine_threadsafe(self.play_next(ctx), self.bot.loop) #helper tells play_next to run next song through a special radio(async) signal
+        return _callback
+
+    def remaining_queue(self, ctx):
+        # only the first page, the rest is one !showqueue <page> away
+        self.status.post(ctx.channel, panel=self.queue_dict[ctx.guild.id].render_page(1, title="🎶 Remaining Queue"))
+
+    @commands.command()
+    async def play(self, ctx, *, query):
+        """Plays music from a query or URL."""
+        if not ctx.author.voice:
+            return self.say(ctx, "❌ You must be in a voice channel!")
+
+        # reuses the warm connection, moving it to your channel if needed
+        vc = await self.voice.connect(ctx.author.voice.channel)
+
+        self.say(ctx, f"🔍 Searching for **{query}**...")
+
+        try:
+            # 1. Extract Information
+            # Pooled yt-dlp lookup, repeat requests come straight from the cache
+            info = await self.extractor.resolve(query, ctx.guild.id)
+
+            # 2. Get the title (make_audio_source reads the stream URL from info itself)
+            title = info["title"]
+
+            # 3. Create the audio source (ffprobe and ffmpeg can fail too, e.g. on an expired URL)
+            source = await self.make_source(info, guild_id=ctx.guild.id)
+
+        except Exception as e:
+            print(f"yt-dlp error: {e}")
+            if not (vc.is_playing() or vc.is_paused()):
+                self.voice.idle(ctx.guild)  # nothing to play after all, leave after the idle timeout
+            # Log the error for debugging, send a friendly message to the user
+            return self.say(ctx, f"❌ Failed to load audio for **{query}**. The source may be unavailable or private.")
+
+        # 4. Play
+        if vc.is_playing():
+            vc.stop()
+
+        vc.play(
+            source,
+            after=self.next_song_callback(ctx)
+        )  # Automatically play the next song in the queue, callback to play_next which pulls next song from queue
+        track = Track(query)
+        track.update(info)
+        self.set_now_playing(ctx.guild.id, track)
+        self.queue_changed(ctx.guild.id)
+
+        self.say(ctx, f"🎶 Now playing: **{title}**")
+
+    @commands.command()
+    async def play_next(self, ctx):
+        guild_id = ctx.guild.id
+        failed = 0
+        # tries the queued songs in order until one of them loads
+        while True:
+            vc = ctx.voice_client
+            if not vc or guild_id in self.voice.leaving:
+                self.song_ended_at.pop(guild_id, None)
+                return  # the song ended because we left the channel
+            if vc.is_playing() or vc.is_paused():
+                # !play stopped the old song and already started its own, the queue waits until that one ends
+                self.song_ended_at.pop(guild_id, None)
+                return
+
+            if not self.queue_dict[guild_id] or failed == MAX_FAILED_TRACKS:
+                self.song_ended_at.pop(guild_id, None)  # no next song, so no gap to measure
+                self.set_now_playing(guild_id, None)
+                self.voice.idle(ctx.guild)  # stay connected a while in case more songs come
+                if failed == MAX_FAILED_TRACKS and self.queue_dict[guild_id]:
+                    self.say(ctx, f"❌ {failed} songs in a row failed to load, stopping. "
+                                  "The rest is still queued, `!queue` a song to go on.")
+                else:
+                    self.say(ctx, "🎧 Queue finished!")
+                return
+
+            track = self.queue_dict[guild_id].popleft()
+            query = track.query
+            if not self.prefetcher.is_ready(guild_id, query):
+                self.say(ctx, f"⏳ Loading **{query}**...")
+
+            try:
+                if track.start_at:
+                    # resuming after a restart, the prefetched copy would start from the beginning
+                    self.prefetcher.cancel(guild_id)
+                    info = await self.extractor.resolve(query, guild_id)
+                    source = await self.make_source(info, track.start_at, guild_id)
+                else:
+                    # Usually already prepared by the prefetcher while the last song was playing
+                    info, source = await self.prefetcher.take(guild_id, query)
+                break
+            except Exception as e:
+                print(f"yt-dlp error: {e}")
+                self.say(ctx, f"❌ Failed to load audio for **{query}**. Skipping it.")
+                self.queue_changed(guild_id)  # it is gone from the queue, start on the next one
+                failed += 1
+
+        track.update(info)
+        title = info['title']
+        vc.play(source, after=self.next_song_callback(ctx))
+        self.voice.busy(ctx.guild)
+
+        ended = self.song_ended_at.pop(guild_id, None)
+        if ended is not None:
+            gap = time.perf_counter() - ended
+            log.info("Transition gap in guild %s: %.1f ms", guild_id, gap * 1000)
+            if self.bot.metrics:
+                self.bot.metrics.observe("music_transition_gap_seconds", gap)
+        self.set_now_playing(guild_id, track)
+        self.queue_changed(guild_id)
+
+        self.say(ctx, f"🎶 Now playing: **{title}**")
+        self.remaining_queue(ctx)
+
+    @commands.command()
+    async def queue(self, ctx, *, query):
+        guild_id = ctx.guild.id
+        vc = ctx.voice_client
+        position = self.queue_dict[guild_id].append(Track(query))
+
+        # Add song to queue (store only the query, extraction happens later)
+        self.say(ctx, f"📌 Added to queue: **{query}** (#{position}). See it all with `!showqueue`")
+
+        self.queue_changed(guild_id)
+
+        # If nothing is playing, start with the first song in the queue
+        # (that may be one restored from before a restart, not the one just added)
+        if not vc or not (vc.is_playing() or vc.is_paused()):
+            if ctx.author.voice:
+                await self.voice.connect(ctx.author.voice.channel)
+            elif not vc:
+                return self.say(ctx, "❌ You must be in a voice channel!")
+            await self.play_next(ctx)
+
+    @commands.command()
+    async def playlist(self, ctx, url):
+        """Queues a whole playlist. Songs are added as they are found and playback starts with the first one."""
+        guild_id = ctx.guild.id
+        if not ctx.voice_client and not ctx.author.voice:
+            return self.say(ctx, "❌ You must be in a voice channel!")
+
+        self.say(ctx, "📜 Loading playlist...")
+        added = 0
+        try:
+            async for entry in self.extractor.iter_playlist(url, guild_id):
+                # just the listing for now, the stream itself is resolved when the song is about to play
+                self.queue_dict[guild_id].append(Track(entry["url"], entry["title"], entry["duration"]))
+                added += 1
+
+                vc = ctx.voice_client
+                if added == 1 and not (vc and (vc.is_playing() or vc.is_paused())):
+                    if ctx.author.voice:
+                        await self.voice.connect(ctx.author.voice.channel)
+                    await self.play_next(ctx)
+                elif added % 50 == 1:
+                    self.queue_changed(guild_id)
+        except Exception as e:
+            print(f"yt-dlp error: {e}")
+            self.say(ctx, f"❌ Failed to read the playlist after {added} songs.")
+
+        self.queue_changed(guild_id)
+        self.say(ctx, f"📜 Added {added} songs from the playlist.")
+
+    @commands.command()
+    async def showqueue(self, ctx, page: int = 1):
+        """Shows one page of the queue."""
+        await ctx.send(self.queue_dict[ctx.guild.id].render_page(page))
+
+    @commands.command()
+    async def insert(self, ctx, position: int, *, query):
+        """Puts a song at a given spot in the queue."""
+        position = self.queue_dict[ctx.guild.id].insert(position, Track(query))
+        self.queue_changed(ctx.guild.id)  # redo the prefetch if the next song changed
+        self.say(ctx, f"📌 Inserted **{query}** at #{position}")
+
+    @commands.command()
+    async def move(self, ctx, source: int, target: int):
+        """Moves a song to another spot in the queue."""
+        try:
+            track = self.queue_dict[ctx.guild.id].move(source, target)
+        except IndexError:
+            return self.say(ctx, f"❌ There is no song #{source} in the queue.")
+        self.queue_changed(ctx.guild.id)
+        self.say(ctx, f"↕️ Moved **{track.title}** to #{target}")
+
+    # !remove takes away the chat cog's secret role, so this one is !unqueue
+    @commands.command(name="unqueue")
+    async def remove(self, ctx, position: int):
+        """Removes a song from the queue."""
+        try:
+            track = self.queue_dict[ctx.guild.id].remove(position)
+        except IndexError:
+            return self.say(ctx, f"❌ There is no song #{position} in the queue.")
+        self.queue_changed(ctx.guild.id)
+        self.say(ctx, f"🗑️ Removed **{track.title}**")
+
+    @commands.command()
+    async def shuffle(self, ctx):
+        """Shuffles the queue."""
+        self.queue_dict[ctx.guild.id].shuffle()
+        self.queue_changed(ctx.guild.id)
+        self.say(ctx, "🔀 Shuffled the queue")
+
+    # --- Control Commands ---
+    @commands.command()
+    async def pause(self, ctx):
+        """Pauses the current song."""
+        vc = ctx.voice_client
+        if vc and vc.is_playing():
+            vc.pause()
+            self.say(ctx, "⏸️ Paused")
+        elif not vc:
+            self.say(ctx, "❌ Not connected to a voice channel.")
+
+    @commands.command()
+    async def resume(self, ctx):
+        """Resumes the current song."""
+        vc = ctx.voice_client
+        if vc and vc.is_paused():
+            vc.resume()
+            self.say(ctx, "▶️ Resumed")
+        elif not vc:
+            self.say(ctx, "❌ Not connected to a voice channel.")
+
+    @commands.command()
+    async def stop(self, ctx):
+        """Stops the song and disconnects the bot."""
+        vc = ctx.voice_client
+        if vc:
+            await self.voice.disconnect(ctx.guild)
+            self.say(ctx, "⏹️ Stopped and left the channel")
+        else:
+            self.say(ctx, "❌ Not connected to a voice channel.")
+
+    @commands.command()
+    async def volume(self, ctx, percent: int = None):
+        """Shows or sets the volume in percent."""
+        guild_id = ctx.guild.id
+        if percent is None:
+            return self.say(ctx, f"🔊 Volume: {round(self.volumes.get(guild_id, 1.0) * 100)}%")
+        if not 0 <= percent <= 200:
+            return self.say(ctx, "❌ The volume goes from 0 to 200.")
+        self.volumes[guild_id] = percent / 100
+        # the prepared next song may have been built without volume control, build it again
+        self.prefetcher.cancel(guild_id)
+        self.prefetch_next(guild_id)
+
+        vc = ctx.voice_client
+        if vc and vc.is_playing() and not hasattr(vc.source, "track_gain"):
+            # this song goes to Discord as Opus untouched, only the next one can be made louder or quieter
+            return self.say(ctx, f"🔊 Volume set to {percent}% from the next song")
+        self.say(ctx, f"🔊 Volume set to {percent}%")
+
+    @commands.command()
+    async def skip(self, ctx):
+        vc = ctx.voice_client
+        if not vc:
+            return self.say(ctx, "❌ Not connected to a voice channel.")
+
+        if vc.is_playing():
+            vc.stop()  # This alone triggers play_next automatically
+            self.say(ctx, "⏭️ Skipped the current song.")
+        else:
+            self.say(ctx, "❌ No song is currently playing.")
+
+    @commands.command()
+    async def cachestats(self, ctx):
+        """Shows how well the on-disk audio cache is doing."""
+        cache = get_audio_cache()
+        if not cache:
+            return await ctx.send("💾 The audio cache is off (set AUDIO_CACHE_DIR to turn it on).")
+        await ctx.send(f"💾 Audio cache: {cache.stats()}")
+
+
+async def setup(bot):
+    load_opus()
+    await bot.add_cog(Music(bot))
@@ -0,0 +1,131 @@
+import os
+import re
+import time
+import asyncio
+import discord
+from discord.ext import commands
+from cogs import get_scheduler
+from poll_store import Poll, PollStore, NUMBERS
+
+units = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def results_embed(poll, final=False):
+    """The poll message: the question, a bar per option and when it closes."""
+    voters = sum(poll.counts)
+    lines = []
+    for emoji, option, count in zip(poll.emojis, poll.options, poll.counts):
+        share = count / voters if voters else 0
+        bar = "▓" * round(share * 10) + "░" * (10 - round(share * 10))
+        lines.append(f"{emoji} **{option}**\n{bar} {count} ({share:.0%})")
+    ending = "Final results" if final else f"Closes <t:{int(poll.closes)}:R>"
+    embed = discord.Embed(
+        title="📊 " + ("Poll closed" if final else "Poll"),
+        description=f"**{poll.question}**\n\n" + "\n".join(lines) + f"\n\n{ending}",
+        color=discord.Color.dark_grey() if final else discord.Color.blurple(),
+    )
+    embed.set_footer(text=f"{voters} voters · one vote each, react again to change it")
+    return embed
+
+
+class Polls(commands.Cog):
+    """!poll, counted from reaction events as they come in instead of reading the reactions back."""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.polls = PollStore(os.getenv("POLL_DB", "polls.db"))
+        # the results embed is edited at most once every POLL_REFRESH seconds, however fast votes come in
+        self.refresh = float(os.getenv("POLL_REFRESH", "5"))
+        self._refresher = None
+        # deadlines wait in the scheduler, so polls still close after a restart
+        self.scheduler = get_scheduler(bot)
+        self.scheduler.on("poll")(self.close_poll)
+
+    async def cog_load(self):
+        self.polls.start()
+        self._refresher = asyncio.ensure_future(self.refresh_results())
+
+    def cog_unload(self):
+        self.scheduler.handlers.pop("poll", None)
+        self._refresher.cancel()
+        self.polls.close()  # save the votes since the last checkpoint
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        self.scheduler.start()
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_add(self, payload):
+        if payload.user_id != self.bot.user.id:
+            self.polls.vote(payload.message_id, payload.user_id, str(payload.emoji))
+
+    @commands.Cog.listener()
+    async def on_raw_reaction_remove(self, payload):
+        self.polls.unvote(payload.message_id, payload.user_id, str(payload.emoji))
+
+    async def refresh_results(self):
+        while True:
+            await asyncio.sleep(self.refresh)
+            for poll in list(self.polls.polls.values()):
+                if poll.changed:
+                    poll.changed = False
+                    await self.show(poll)
+
+    async def show(self, poll, final=False):
+        message = self.bot.get_partial_messageable(poll.channel_id).get_partial_message(poll.message_id)
+        try:
+            await message.edit(embed=results_embed(poll, final))
+        except discord.HTTPException as e:
+            print(f"Couldn't update poll {poll.message_id}: {e}")
+
+    # !poll 2h Pizza or pasta? | Pizza | Pasta   (just a question makes it a 👍/👎 poll, open for a day)
+    @commands.command()
+    async def poll(self, ctx, *, text):
+        duration = 86400
+        first, _, rest = text.partition(" ")
+        match = re.fullmatch(r"(\d+)([smhd])", first)
+        if match and rest:
+            duration = int(match.group(1)) * units[match.group(2)]
+            text = rest
+        question, *options = [part.strip() for part in text.split("|")]
+        options = [option for option in options if option]
+        if not options:
+            options = ["Yes", "No"]
+        if len(options) > len(NUMBERS):
+            await ctx.send(f"❌ A poll can have at most {len(NUMBERS)} options.")
+            return
+
+        closes = time.time() + duration
+        # the empty results go out with the message, no edit needed
+        poll_message = await ctx.send(embed=results_embed(Poll(0, ctx.channel.id, ctx.author.id, question, options, closes)))
+        poll = self.polls.open(poll_message.id, ctx.channel.id, ctx.author.id, question, options, closes)
+        self.scheduler.add("poll", duration, {"message_id": poll.message_id}, key=f"poll:{poll.message_id}")
+        for emoji in poll.emojis:
+            await poll_message.add_reaction(emoji)
+
+    # !closepoll [message id], without an id it's your latest open poll in this channel
+    @commands.command()
+    async def closepoll(self, ctx, message_id: int = None):
+        if message_id is None:
+            mine = [poll for poll in self.polls.polls.values()
+                    if poll.author_id == ctx.author.id and poll.channel_id == ctx.channel.id]
+            message_id = max((poll.message_id for poll in mine), default=None)
+        poll = self.polls.polls.get(message_id)
+        if poll is None:
+            await ctx.send("❌ There is no open poll with that id.")
+            return
+        if poll.author_id != ctx.author.id and not ctx.channel.permissions_for(ctx.author).manage_messages:
+            await ctx.send("❌ Only whoever started the poll can close it early.")
+            return
+        self.scheduler.cancel_key(f"poll:{poll.message_id}")
+        await self.close_poll({"message_id": poll.message_id})
+        await ctx.send("✅ Poll closed.")
+
+    async def close_poll(self, job):
+        poll = self.polls.end(job["message_id"])
+        if poll:
+            await self.show(poll, final=True)
+
+
+async def setup(bot):
+    await bot.add_cog(Polls(bot))
@@ -0,0 +1,59 @@
+# Runs all the bots in one process with one gateway connection.
+# Which cogs get loaded comes from host_config.json (or the file in HOST_CONFIG),
+# so you can leave out e.g. "cogs.music" on a machine without ffmpeg.
+#
+# usage: python host.py
+import os
+import json
+import time
+import logging
+import discord
+from dotenv import load_dotenv
+from cogs import Bot
+from log_setup import setup_logging
+
+CONFIG_PATH = os.getenv("HOST_CONFIG", os.path.join(os.path.dirname(os.path.abspath(__file__)), "host_config.json"))
+
+
+def make_bot(config):
+    intents = discord.Intents.default()
+    for name, enabled in config.get("intents", {}).items():
+        setattr(intents, name, enabled)
+
+    # "lean_members": true skips downloading every server's member list (see cogs/__init__.py)
+    bot = Bot(command_prefix=config.get("prefix", "!"), intents=intents, lean_members=config.get("lean_members"))
+    started = time.perf_counter()
+
+    @bot.event
+    async def setup_hook():
+        for name in config["cogs"]:
+            loaded = time.perf_counter()
+            try:
+                await bot.load_extension(name)
+            except Exception as e:
+                # one broken cog shouldn't take the other bots down with it
+                print(f"❌ Failed to load {name}: {e}")
+                continue
+            print(f"Loaded {name} in {(time.perf_counter() - loaded) * 1000:.0f} ms")
+
+    @bot.event
+    async def on_ready():
+        print(f"✅ {bot.user} is running {len(bot.cogs)} cogs, ready {time.perf_counter() - started:.1f} s after start")
+
+    return bot
+
+
+def main():
+    load_dotenv()
+    with open(CONFIG_PATH, encoding="utf-8") as f:
+        config = json.load(f)
+    # one background writer thread for every cog's logs, see BOT1/log_setup.py for the LOG_* settings
+    setup_logging(logging.INFO, root=True)
+    # the music cog's yt-dlp workers are left to start on the first song, so
+    # the bots that never play music don't pay for them
+    make_bot(config).run(os.getenv('DISCORD_TOKEN'), log_handler=None)
+
+
+# everything happens in main(): the yt-dlp workers import this file again when they start
+if __name__ == "__main__":
+    main()